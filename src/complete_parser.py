@@ -19,7 +19,7 @@ def parse_complete_ui(xml_path: str) -> Dict[str, Any]:
     element_id = 0
     
     # First pass: collect everything visible
-    for node in root.xpath("//node"):
+    for node in root.iter("node"):
         elem_data = _extract_all_visible(node, element_id)
         if elem_data:
             all_elements.append(elem_data)
@@ -25,7 +25,7 @@ def parse_dedup_tree(xml_path: str) -> Dict[str, Any]:
     if not dedup_tree:
         # Fallback: just get all visible elements
         all_elements = []
-        for node in root.xpath("//node"):
+        for node in root.iter("node"):
             # Check if enabled
             if node.get("enabled", "true") != "true":
                 continue
@@ -2,6 +2,7 @@
 Fast tree parser that maintains parent-child relationships
 """
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Set
 
 
@@ -49,6 +50,13 @@ def _build_tree(node, seen_texts: Set[str], element_id: List[int]) -> Optional[D
     # Determine node type
     node_type = _get_type(class_name, clickable)
     
+    # Cheap reject: a leaf with no text and nothing to tap or type into.
+    # It still consumes an id so numbering matches the full build.
+    if (not visible_text and not clickable and len(node) == 0 and
+            node_type not in ('input', 'button')):
+        element_id[0] += 1
+        return None
+    
     # Check if this is just a container with no meaningful content
     is_container = node_type in ['container', 'layout']
     
@@ -94,8 +102,9 @@ def _build_tree(node, seen_texts: Set[str], element_id: List[int]) -> Optional[D
     return current
 
 
+@lru_cache(maxsize=128)
 def _get_type(class_name: str, clickable: bool) -> str:
-    """Determine element type"""
+    """Determine element type (cached, class names repeat across a dump)"""
     class_lower = class_name.lower()
     
     if 'edittext' in class_lower:
@@ -148,87 +157,81 @@ def _deduplicate_tree(node: Dict[str, Any], seen: Set[str]) -> bool:
 
 def get_family_tree(tree: Dict[str, Any]) -> Dict[str, Any]:
     """Extract family tree showing clear parent-child relationships"""
-    relationships = []
-    
-    def find_label_input_pairs(node):
-        """Find label-input pairs within containers"""
-        children = node.get("children", [])
+    # Label-input pairs and "contains" links between siblings' parents
+    pair_relationships = []
+    # Hierarchy links, kept only if the text isn't already covered above
+    hierarchy_relationships = []
+    
+    # Single iterative DFS. Each entry is (node, role, info, hierarchy_parent):
+    #   "root"    - the tree root, scanned for pairs but not reported itself
+    #   "child"   - scanned for pairs; info is the text of its pair-scan parent
+    #   "label"   - text label paired with the input given in info
+    #   "skipped" - inside a paired label/input, only reported in the hierarchy
+    stack = [(tree, "root", None, "Screen")]
+    while stack:
+        node, role, info, hierarchy_parent = stack.pop()
+        node_text = node.get("text", "")
         
-        # Look for consecutive label-input pairs
-        i = 0
-        while i < len(children):
-            child = children[i]
-            
-            # Check if this is a text label followed by an input
-            if (child.get("type") == "text" and 
-                child.get("text") and
-                i + 1 < len(children) and
-                children[i + 1].get("type") == "input"):
-                
-                # Found a label-input pair
-                relationships.append({
-                    "label": child["text"],
-                    "input": children[i + 1].get("resourceId", f"input-{children[i + 1].get('id', '')}"),
-                    "relationship": "label_for_input"
-                })
-                i += 2  # Skip both
-            else:
-                # Process this node normally
-                if child.get("text"):
-                    # Find parent text
-                    parent_text = node.get("text", "")
-                    if not parent_text:
-                        # Look up the tree for a meaningful parent
-                        parent_text = "Screen"
-                    
-                    if parent_text and parent_text != child.get("text"):
-                        relationships.append({
-                            "parent": parent_text,
-                            "child": child["text"],
-                            "relationship": "contains"
-                        })
-                
-                # Recursively process children
-                find_label_input_pairs(child)
-                i += 1
+        if role == "label":
+            # Found a label-input pair
+            input_node = info
+            pair_relationships.append({
+                "label": node_text,
+                "input": input_node.get("resourceId", f"input-{input_node.get('id', '')}"),
+                "relationship": "label_for_input"
+            })
+        elif role == "child" and node_text and info != node_text:
+            pair_relationships.append({
+                "parent": info,
+                "child": node_text,
+                "relationship": "contains"
+            })
         
-        # Don't double-process containers, they're already handled above
-    
-    # Start from root
-    find_label_input_pairs(tree)
-    
-    # Also extract top-level relationships
-    def extract_hierarchy(node, parent_text="Screen"):
-        """Extract hierarchical relationships"""
-        node_text = node.get("text", "")
+        # Hierarchical relationship for any meaningful non-container node
+        if (role != "root" and node_text and node_text != hierarchy_parent and
+                node.get("type") != "container"):
+            hierarchy_relationships.append({
+                "parent": hierarchy_parent,
+                "child": node_text,
+                "relationship": "contains"
+            })
+        
+        children = node.get("children", [])
+        if not children:
+            continue
         
-        # Add relationship if this node has meaningful text
-        if node_text and node_text != parent_text and node.get("type") != "container":
-            found = False
-            # Check if already in relationships
-            for rel in relationships:
-                if (rel.get("child") == node_text or 
-                    rel.get("label") == node_text):
-                    found = True
-                    break
-            
-            if not found:
-                relationships.append({
-                    "parent": parent_text,
-                    "child": node_text,
-                    "relationship": "contains"
-                })
+        effective_parent = hierarchy_parent if role == "root" else (node_text or hierarchy_parent)
+        child_entries = [(child, "skipped", None, effective_parent) for child in children]
         
-        # Process children with this node as parent
-        effective_parent = node_text if node_text else parent_text
-        for child in node.get("children", []):
-            extract_hierarchy(child, effective_parent)
+        if role in ("root", "child"):
+            # Look for consecutive label-input pairs
+            parent_text = node_text or "Screen"
+            i = 0
+            while i < len(children):
+                child = children[i]
+                if (child.get("type") == "text" and
+                    child.get("text") and
+                    i + 1 < len(children) and
+                    children[i + 1].get("type") == "input"):
+                    child_entries[i] = (child, "label", children[i + 1], effective_parent)
+                    i += 2  # Skip both
+                else:
+                    child_entries[i] = (child, "child", parent_text, effective_parent)
+                    i += 1
+        
+        stack.extend(reversed(child_entries))
+    
+    # Drop hierarchy links whose text already appears as a child or label
+    seen_children = set()
+    for rel in pair_relationships:
+        seen_children.add(rel.get("child") or rel.get("label"))
     
-    # Extract top-level relationships
-    if tree.get("children"):
-        for child in tree["children"]:
-            extract_hierarchy(child)
+    relationships = pair_relationships
+    for rel in hierarchy_relationships:
+        if rel["child"] not in seen_children:
+            seen_children.add(rel["child"])
+            relationships.append(rel)
     
     return {
         "relationships": relationships
-    }
\ No newline at end of file
+    }
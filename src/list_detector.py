@@ -1,10 +1,22 @@
 """
 List detector - Identifies and properly groups list items
 """
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
+from array import array
 import re
 
 
+# Label fragments marking promotional badges rather than item titles
+_BADGES = ("NEW!", "HOT!", "IPL", "5%")
+
+# Label fragments identifying game titles in list items
+_GAMES = ("poker", "rummy", "patti", "skill", "cricket", "opinio", "crash", "call break")
+
+# Single-pass matchers for the keyword lists above
+_BADGE_RE = re.compile("|".join(map(re.escape, _BADGES)), re.IGNORECASE)
+_GAME_RE = re.compile("|".join(map(re.escape, _GAMES)), re.IGNORECASE)
+
+
 def detect_and_group_list_items(elements: List[Dict]) -> List[Dict]:
     """
     Detect list patterns and group items correctly.
@@ -42,57 +54,65 @@ def _identify_list_items(elements: List[Dict]) -> List[Dict]:
     """
     Identify individual list items by analyzing bounds and patterns.
     """
+    # Parse every element's bounds once into center-coordinate columns
+    x_positions, y_positions = _bounds_to_soa(elements)
+    
     # Sort elements by position (y first for vertical lists, x for horizontal)
     # Detect if it's horizontal or vertical by checking variance
-    x_positions = [_get_x_center(_parse_bounds(e.get("bounds", "[0,0][0,0]"))) for e in elements]
-    y_positions = [_get_y_center(_parse_bounds(e.get("bounds", "[0,0][0,0]"))) for e in elements]
-    
     x_variance = max(x_positions) - min(x_positions) if x_positions else 0
     y_variance = max(y_positions) - min(y_positions) if y_positions else 0
     
     is_horizontal = x_variance > y_variance
     
-    # Sort by primary axis
-    if is_horizontal:
-        elements.sort(key=lambda e: _get_x_center(_parse_bounds(e.get("bounds", "[0,0][0,0]"))))
-    else:
-        elements.sort(key=lambda e: _get_y_center(_parse_bounds(e.get("bounds", "[0,0][0,0]"))))
+    # Sort by primary axis, keeping the position column aligned
+    positions = x_positions if is_horizontal else y_positions
+    order = sorted(range(len(elements)), key=positions.__getitem__)
+    elements[:] = [elements[i] for i in order]
+    positions = array("l", (positions[i] for i in order))
+    
+    # Classify badges once; both the pattern finder and the grouping need it
+    badges = [_has_badge(e) for e in elements]
     
     # Find patterns - look for repeating element types
-    patterns = _find_repeating_patterns(elements)
+    patterns = _find_repeating_patterns(elements, badges)
     
     # Group elements into list items
     list_items = []
     
     if patterns:
         # Use patterns to group
-        list_items = _group_by_patterns(elements, patterns, is_horizontal)
+        list_items = _group_by_patterns(elements, patterns, is_horizontal, positions, badges)
     else:
         # Fallback: group by proximity
-        list_items = _group_by_proximity(elements, is_horizontal)
+        list_items = _group_by_proximity(elements, is_horizontal, positions)
     
     return list_items
 
 
-def _find_repeating_patterns(elements: List[Dict]) -> List[List[str]]:
+def _has_badge(e: Dict) -> bool:
+    """Check if an element's label contains a badge marker"""
+    return _BADGE_RE.search(e.get("label", "")) is not None
+
+
+def _type_sig(e: Dict, is_badge: bool) -> str:
+    """Type signature of an element used for pattern matching"""
+    if e.get("action") == "tap":
+        return "tap_area"
+    if e["type"] == "text":
+        return "badge" if is_badge else "text"
+    return e["type"]
+
+
+def _find_repeating_patterns(elements: List[Dict], badges: Optional[List[bool]] = None) -> List[List[str]]:
     """
     Find repeating patterns in element types.
     For example: [text, text, button] repeating
     """
+    if badges is None:
+        badges = [_has_badge(e) for e in elements]
+    
     # Create type sequence
-    type_sequence = []
-    for e in elements:
-        # Create a type signature
-        if e.get("action") == "tap":
-            type_sig = "tap_area"
-        elif e["type"] == "text" and any(badge in e.get("label", "").upper() for badge in ["NEW!", "HOT!", "IPL", "5%"]):
-            type_sig = "badge"
-        elif e["type"] == "text":
-            type_sig = "text"
-        else:
-            type_sig = e["type"]
-        
-        type_sequence.append(type_sig)
+    type_sequence = [_type_sig(e, is_badge) for e, is_badge in zip(elements, badges)]
     
     # Find repeating subsequences
     patterns = []
@@ -112,10 +132,15 @@ def _find_repeating_patterns(elements: List[Dict]) -> List[List[str]]:
     return patterns
 
 
-def _group_by_patterns(elements: List[Dict], patterns: List[List[str]], is_horizontal: bool) -> List[Dict]:
+def _group_by_patterns(elements: List[Dict], patterns: List[List[str]], is_horizontal: bool,
+                       positions: Optional[array] = None,
+                       badges: Optional[List[bool]] = None) -> List[Dict]:
     """Group elements based on detected patterns."""
     if not patterns:
-        return _group_by_proximity(elements, is_horizontal)
+        return _group_by_proximity(elements, is_horizontal, positions)
+    
+    if badges is None:
+        badges = [_has_badge(e) for e in elements]
     
     # Use the longest pattern
     pattern = max(patterns, key=len)
@@ -127,10 +152,10 @@ def _group_by_patterns(elements: List[Dict], patterns: List[List[str]], is_horiz
         if item_elements:
             # Find the main text (title) for this item
             title = "Item"
-            for e in item_elements:
-                if e["type"] == "text" and not any(badge in e.get("label", "").upper() for badge in ["NEW!", "HOT!", "IPL", "5%"]):
+            for e, is_badge in zip(item_elements, badges[i:i+pattern_len]):
+                if e["type"] == "text" and not is_badge:
                     # This is likely the title
-                    if any(game in e.get("label", "").lower() for game in ["poker", "rummy", "patti", "skill", "cricket", "opinio", "crash", "call break"]):
+                    if _GAME_RE.search(e.get("label", "")):
                         title = e["label"]
                         break
             
@@ -143,16 +168,22 @@ def _group_by_patterns(elements: List[Dict], patterns: List[List[str]], is_horiz
     return list_items
 
 
-def _group_by_proximity(elements: List[Dict], is_horizontal: bool) -> List[Dict]:
-    """Group elements by spatial proximity."""
+def _group_by_proximity(elements: List[Dict], is_horizontal: bool,
+                        positions: Optional[array] = None) -> List[Dict]:
+    """
+    Group elements by spatial proximity.
+    positions holds each element's center on the primary axis; it is
+    computed from the bounds when not supplied.
+    """
+    if positions is None:
+        x_positions, y_positions = _bounds_to_soa(elements)
+        positions = x_positions if is_horizontal else y_positions
+    
     list_items = []
     current_item = None
     last_pos = -1000
     
-    for elem in elements:
-        bounds = _parse_bounds(elem.get("bounds", "[0,0][0,0]"))
-        pos = _get_x_center(bounds) if is_horizontal else _get_y_center(bounds)
-        
+    for elem, pos in zip(elements, positions):
         # Check if this is a new item
         threshold = 200 if is_horizontal else 150
         if pos - last_pos > threshold:
@@ -183,6 +214,17 @@ def _group_by_proximity(elements: List[Dict], is_horizontal: bool) -> List[Dict]
     return list_items
 
 
+def _bounds_to_soa(elements: List[Dict]) -> Tuple[array, array]:
+    """Parse all element bounds once into parallel x/y center arrays"""
+    x_centers = array("l")
+    y_centers = array("l")
+    for e in elements:
+        x1, y1, x2, y2 = _parse_bounds(e.get("bounds", "[0,0][0,0]"))
+        x_centers.append((x1 + x2) // 2)
+        y_centers.append((y1 + y2) // 2)
+    return x_centers, y_centers
+
+
 def _parse_bounds(bounds_str: str) -> Tuple[int, int, int, int]:
     """Parse bounds string '[x1,y1][x2,y2]' into tuple"""
     match = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', bounds_str)
@@ -190,12 +232,3 @@ def _parse_bounds(bounds_str: str) -> Tuple[int, int, int, int]:
         return (0, 0, 0, 0)
     return tuple(map(int, match.groups()))
 
-
-def _get_x_center(bounds: Tuple[int, int, int, int]) -> int:
-    """Get x center of bounds"""
-    return (bounds[0] + bounds[2]) // 2
-
-
-def _get_y_center(bounds: Tuple[int, int, int, int]) -> int:
-    """Get y center of bounds"""
-    return (bounds[1] + bounds[3]) // 2
\ No newline at end of file
@@ -3,18 +3,21 @@ Vertex AI client for UI automation with smart prompt management
 """
 import os
 import json
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 import vertexai
 from vertexai.generative_models import GenerativeModel, GenerationConfig
 from dotenv import load_dotenv
-from .prompts import SYSTEM_PROMPT, FEW_SHOT_EXAMPLES
+from .prompts import SYSTEM_PROMPT, FEW_SHOT_EXAMPLES, MULTI_STEP_SYSTEM_PROMPT
+from .parser import to_json
+from .llm_common import LLMClientBase, cache_key
 
 # Load environment variables
 load_dotenv()
 
 
-class UIAutomationLLM:
+class UIAutomationLLM(LLMClientBase):
     """Smart LLM client for UI automation that maintains context"""
     
     def __init__(self, project_id: Optional[str] = None, location: str = "us-central1"):
@@ -48,6 +51,12 @@ class UIAutomationLLM:
             max_output_tokens=256,  # Keep responses concise
             response_mime_type="application/json"  # Force JSON output
         )
+        
+        # Multi-step planning model, created on first use
+        self._multi_step_model = None
+        
+        # Analysis cache
+        super().__init__()
     
     def analyze_screen(self, screen_dump: Dict[str, Any], user_goal: str) -> Dict[str, Any]:
         """
@@ -60,17 +69,26 @@ class UIAutomationLLM:
         Returns:
             Dict with action, element_index, reason, confidence
         """
+        # Serialize the elements once; the same JSON feeds the cache key and prompt
+        elements_json = to_json(screen_dump['screen_elements'])
+        
+        # Return cached analysis if this exact screen/goal was seen before
+        key = cache_key(elements_json, user_goal)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        
         # Prepare context-aware prompt
         prompt = f"""
 Current user goal: {user_goal}
 
 Current screen UI elements:
-{json.dumps(screen_dump['screen_elements'], indent=2)}
+{elements_json}
 
 Screen summary:
 - Total elements: {screen_dump['total_elements']}
 - Clickable elements: {screen_dump['clickable_elements']}
-- Element types: {json.dumps(screen_dump['element_types'])}
+- Element types: {to_json(screen_dump['element_types'])}
 
 Based on the user's goal and current screen, what action should be taken?
 """
@@ -90,6 +108,7 @@ Based on the user's goal and current screen, what action should be taken?
             if not all(field in result for field in required_fields):
                 raise ValueError("Invalid response format from LLM")
             
+            self._remember(key, result)
             return result
             
         except json.JSONDecodeError as e:
@@ -123,7 +142,7 @@ Based on the user's goal and current screen, what action should be taken?
 Current user goal: {user_goal}
 {history_text}
 Current screen UI elements:
-{json.dumps(screen_dump['screen_elements'], indent=2)}
+{to_json(screen_dump['screen_elements'])}
 
 Screen summary:
 - Total elements: {screen_dump['total_elements']}
@@ -138,14 +157,37 @@ What should be the next action to achieve the goal?
         )
         
         return json.loads(response.text)
+    
+    def _generate_steps(self, prompt: str, max_steps: int) -> str:
+        """Send a multi-step planning prompt to the planning model"""
+        if self._multi_step_model is None:
+            self._multi_step_model = GenerativeModel(
+                self.model_name,
+                system_instruction=MULTI_STEP_SYSTEM_PROMPT
+            )
+        
+        response = self._multi_step_model.generate_content(
+            prompt,
+            generation_config=GenerationConfig(
+                temperature=0.1,
+                top_p=0.95,
+                max_output_tokens=128 * max_steps + 64,
+                response_mime_type="application/json"
+            )
+        )
+        return response.text
 
 
 # Singleton instance for reuse
 _llm_instance = None
+_llm_instance_lock = threading.Lock()
 
 def get_llm_client() -> UIAutomationLLM:
     """Get or create LLM client instance"""
     global _llm_instance
     if _llm_instance is None:
-        _llm_instance = UIAutomationLLM()
+        with _llm_instance_lock:
+            # Re-check: another thread may have created it while we waited
+            if _llm_instance is None:
+                _llm_instance = UIAutomationLLM()
     return _llm_instance
\ No newline at end of file
@@ -3,17 +3,20 @@ Simple Google AI (Gemini) client using API key - no GCP setup needed!
 """
 import os
 import json
+import threading
 import requests
 from typing import Dict, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
-from .prompts import SYSTEM_PROMPT, FEW_SHOT_EXAMPLES
+from .prompts import SYSTEM_PROMPT, FEW_SHOT_EXAMPLES, MULTI_STEP_SYSTEM_PROMPT
+from .parser import to_json
+from .llm_common import LLMClientBase, cache_key
 
 # Load environment variables
 load_dotenv()
 
 
-class SimpleGeminiClient:
+class SimpleGeminiClient(LLMClientBase):
     """Simple Gemini client using API key (via Google AI Studio)"""
     
     def __init__(self, api_key: Optional[str] = None):
@@ -30,6 +33,9 @@ class SimpleGeminiClient:
         # Use Gemini 1.5 Flash for fast responses
         self.model = "gemini-1.5-flash"
         self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
+        
+        # Analysis cache
+        super().__init__()
     
     def analyze_screen(self, screen_dump: Dict[str, Any], user_goal: str) -> Dict[str, Any]:
         """
@@ -42,6 +48,15 @@ class SimpleGeminiClient:
         Returns:
             Dict with action, element_index, reason, confidence
         """
+        # Serialize the elements once; the same JSON feeds the cache key and prompt
+        elements_json = to_json(screen_dump['screen_elements'])
+        
+        # Return cached analysis if this exact screen/goal was seen before
+        key = cache_key(elements_json, user_goal)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        
         # Build the prompt
         full_prompt = f"""{SYSTEM_PROMPT}
 
@@ -50,12 +65,12 @@ class SimpleGeminiClient:
 Current user goal: {user_goal}
 
 Current screen UI elements:
-{json.dumps(screen_dump['screen_elements'], indent=2)}
+{elements_json}
 
 Screen summary:
 - Total elements: {screen_dump['total_elements']}
 - Clickable elements: {screen_dump['clickable_elements']}
-- Element types: {json.dumps(screen_dump['element_types'])}
+- Element types: {to_json(screen_dump['element_types'])}
 
 Based on the user's goal and current screen, what action should be taken?
 Respond with valid JSON only."""
@@ -105,19 +120,62 @@ Respond with valid JSON only."""
             if not all(field in action_result for field in required_fields):
                 raise ValueError("Invalid response format from LLM")
             
+            self._remember(key, action_result)
             return action_result
             
         except (KeyError, json.JSONDecodeError) as e:
             print(f"Failed to parse response: {result}")
             raise ValueError(f"Failed to parse LLM response: {e}")
+    
+    def _generate_steps(self, prompt: str, max_steps: int) -> str:
+        """Send a multi-step planning prompt to the Gemini API"""
+        full_prompt = f"""{MULTI_STEP_SYSTEM_PROMPT}
+{prompt}
+Respond with valid JSON only."""
+
+        data = {
+            "contents": [{
+                "parts": [{
+                    "text": full_prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.1,
+                "topK": 1,
+                "topP": 0.95,
+                "maxOutputTokens": 128 * max_steps + 64,
+                "responseMimeType": "application/json"
+            }
+        }
+        
+        response = requests.post(
+            f"{self.api_url}?key={self.api_key}",
+            headers={"Content-Type": "application/json"},
+            json=data
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"API error: {response.status_code} - {response.text}")
+        
+        result = response.json()
+        
+        try:
+            return result['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError) as e:
+            print(f"Failed to parse response: {result}")
+            raise ValueError(f"Failed to parse LLM response: {e}")
 
 
 # Singleton instance
 _simple_llm_instance = None
+_simple_llm_instance_lock = threading.Lock()
 
 def get_simple_llm_client() -> SimpleGeminiClient:
     """Get or create simple LLM client instance"""
     global _simple_llm_instance
     if _simple_llm_instance is None:
-        _simple_llm_instance = SimpleGeminiClient()
+        with _simple_llm_instance_lock:
+            # Re-check: another thread may have created it while we waited
+            if _simple_llm_instance is None:
+                _simple_llm_instance = SimpleGeminiClient()
     return _simple_llm_instance
\ No newline at end of file
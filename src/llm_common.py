@@ -0,0 +1,105 @@
+"""
+Pieces shared by the LLM clients: the analysis cache and multi-step planning
+"""
+import json
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from .parser import to_json
+
+# Maximum number of cached screen analyses kept per client
+CACHE_SIZE = 128
+
+
+class LLMClientBase(ABC):
+    """
+    Base for the LLM clients: an LRU cache of screen analyses and
+    multi-step planning. Subclasses send the planning prompt to their
+    backend in _generate_steps.
+    """
+    
+    def __init__(self):
+        # LRU cache of previous analyses keyed on screen + goal. Analyses may
+        # run in worker threads (asyncio.to_thread), so access is locked
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def plan_steps(self, screen_dump: Dict[str, Any], user_goal: str,
+                   max_steps: int = 5) -> List[Dict[str, Any]]:
+        """
+        Plan several actions on the current screen with a single request
+        
+        Args:
+            screen_dump: The UI dump from parse_for_llm()
+            user_goal: What the user wants to achieve
+            max_steps: Maximum number of steps to return
+        
+        Returns:
+            Ordered list of dicts with action, element_index, reason, confidence
+        """
+        prompt = f"""
+Current user goal: {user_goal}
+Maximum steps: {max_steps}
+
+Current screen UI elements:
+{to_json(screen_dump['screen_elements'])}
+"""
+        
+        generated_text = self._generate_steps(prompt, max_steps)
+        
+        try:
+            steps = json.loads(generated_text)["steps"]
+        except (KeyError, TypeError, json.JSONDecodeError) as e:
+            print(f"Failed to parse LLM response: {generated_text}")
+            raise ValueError(f"LLM returned invalid JSON: {e}")
+        
+        return validate_steps(steps, max_steps)
+    
+    @abstractmethod
+    def _generate_steps(self, prompt: str, max_steps: int) -> str:
+        """Send a multi-step planning prompt and return the generated text"""
+    
+    def _cached(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Copy of a cached analysis (marked most recently used), or None"""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            self._cache.move_to_end(key)
+            return dict(cached)
+    
+    def _remember(self, key: bytes, result: Dict[str, Any]):
+        """Store a copy of an analysis, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._cache[key] = dict(result)
+            self._cache.move_to_end(key)
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """Drop all cached screen analyses"""
+        with self._cache_lock:
+            self._cache.clear()
+
+
+def validate_steps(steps: Any, max_steps: int) -> List[Dict[str, Any]]:
+    """Check the shape of a multi-step plan and cap its length"""
+    required_fields = ["action", "element_index", "reason", "confidence"]
+    if not isinstance(steps, list) or not all(
+            isinstance(step, dict) and all(field in step for field in required_fields)
+            for step in steps):
+        raise ValueError("Invalid response format from LLM")
+    # Callers index the screen with element_index, so it must be a real int
+    for step in steps:
+        index = step["element_index"]
+        if isinstance(index, bool) or not isinstance(index, int):
+            raise ValueError(f"Invalid element_index from LLM: {index!r}")
+    return steps[:max_steps]
+
+
+def cache_key(elements_json: str, user_goal: str) -> bytes:
+    """Hash of the serialized screen elements and goal, used as the cache key"""
+    payload = elements_json.encode('utf-8') + b'|' + user_goal.encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).digest()
@@ -1,7 +1,113 @@
 from lxml import etree
-from typing import List, Dict, Any, Tuple
+from xml.etree import ElementTree
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+from functools import lru_cache
+from collections import Counter
+from itertools import groupby
+import io
+import json
+import platform
 import re
+import sys
+
+
+# Precompiled patterns used per node
+_CAMEL_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+# Position descriptions indexed by vertical band * 3 + horizontal band
+_POSITION_NAMES = (
+    "top-left", "top", "top-right",
+    "left", "center", "right",
+    "bottom-left", "bottom", "bottom-right",
+)
+
+
+def _keyword_res(groups: Dict[str, List[str]]) -> List[Tuple[str, Any]]:
+    """Compile each keyword group into one substring alternation"""
+    return [(name, re.compile("|".join(map(re.escape, keywords))))
+            for name, keywords in groups.items()]
+
+
+# Intent keywords for _generate_element_map
+_ELEMENT_MAP_RES = _keyword_res({
+    "auth": ["login", "sign in", "password", "username", "email"],
+    "nav": ["back", "home", "menu", "settings", "profile"],
+    "action": ["submit", "save", "cancel", "ok", "done", "next"],
+    "search": ["search", "find", "filter", "query"]
+})
+
+# Common action keywords for _get_quick_actions, checked in order
+_QUICK_ACTION_RES = _keyword_res({
+    "submit": ["submit", "send", "post", "save", "confirm"],
+    "cancel": ["cancel", "close", "dismiss", "back"],
+    "auth": ["login", "sign in", "log in", "signin"],
+    "search": ["search", "find", "filter"],
+    "add": ["add", "create", "new", "plus"],
+    "settings": ["settings", "preferences", "config"]
+})
+
+# Container keywords in resource ids for _get_container_type, checked in
+# order so an earlier type wins (e.g. "bottom_toolbar" is a header)
+_CONTAINER_RES = _keyword_res({
+    "header": ["toolbar", "actionbar", "header", "appbar"],
+    "navigation": ["bottom", "navigation", "tab"],
+    "form": ["form", "input", "login", "signup"],
+    "list": ["list", "recycler", "grid"],
+    "dialog": ["dialog", "modal", "popup"]
+})
+
+# Screen section order by container type; unknown types go last
+_SECTION_PRIORITY = {
+    "dialog": 0,  # Highest priority if present
+    "header": 1,
+    "navigation": 2,
+    "form": 3,
+    "content": 4,
+    "list": 5,
+    "section": 6
+}
+
+
+def iter_nodes(xml_path: str):
+    """
+    Stream <node> elements in document order without keeping the DOM.
+    Each node is yielded when its start tag is read (attributes are
+    available then) and its subtree is freed once it closes.
+    """
+    for event, node in etree.iterparse(xml_path, events=("start", "end"), tag="node"):
+        if event == "start":
+            yield node
+        else:
+            node.clear()
+            while node.getprevious() is not None:
+                del node.getparent()[0]
+
+
+def _iter_nodes_stdlib(xml_path: str):
+    """
+    Same stream as iter_nodes, from the stdlib ElementTree parser.
+    ElementTree has no parent links, so open elements are kept on a stack;
+    when a node closes, its parent's finished children are dropped.
+    """
+    open_elements = []
+    for event, elem in ElementTree.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            open_elements.append(elem)
+            if elem.tag == "node":
+                yield elem
+        else:
+            open_elements.pop()
+            if elem.tag == "node":
+                elem.clear()
+                if open_elements:
+                    del open_elements[-1][:]
+
+
+# On PyPy the JIT cannot see through lxml's C calls, and the pure-Python
+# stdlib parser is faster
+if platform.python_implementation() == "PyPy":
+    iter_nodes = _iter_nodes_stdlib
 
 
 def parse(xml_path: str) -> List[Dict[str, Any]]:
@@ -15,24 +121,36 @@ def parse(xml_path: str) -> List[Dict[str, Any]]:
     - clickable
     - bounds
     """
-    tree = etree.parse(xml_path)
-    root = tree.getroot()
-    
+    return _parse_nodes(xml_path)
+
+
+def parse_bytes(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Parse an Android UI XML dump already in memory (e.g. piped from
+    adb) into the same list of nodes as parse().
+    """
+    return _parse_nodes(io.BytesIO(data))
+
+
+def _parse_nodes(source: Any) -> List[Dict[str, Any]]:
+    """Collect identifiable nodes from an XML file path or binary file object"""
     nodes = []
     
-    # Traverse all nodes
-    for node in root.xpath("//node"):
-        node_info = {
-            "resource-id": node.get("resource-id", ""),
-            "text": node.get("text", ""),
-            "content-desc": node.get("content-desc", ""),
-            "clickable": node.get("clickable", "false") == "true",
-            "bounds": node.get("bounds", "")
-        }
+    # Stream all nodes
+    for node in iter_nodes(source):
+        resource_id = node.get("resource-id", "")
+        text = node.get("text", "")
+        content_desc = node.get("content-desc", "")
         
         # Only include nodes that have some identifying information
-        if node_info["resource-id"] or node_info["text"] or node_info["content-desc"]:
-            nodes.append(node_info)
+        if resource_id or text or content_desc:
+            nodes.append({
+                "resource-id": sys.intern(resource_id),
+                "text": text,
+                "content-desc": content_desc,
+                "clickable": node.get("clickable", "false") == "true",
+                "bounds": node.get("bounds", "")
+            })
     
     return nodes
 
@@ -50,21 +168,27 @@ def parse_for_llm(xml_path: str) -> List[Dict[str, Any]]:
     - identifiers: Dict with resource-id, text, content-desc
     - ui_class: The Android class name
     """
-    tree = etree.parse(xml_path)
-    root = tree.getroot()
-    
     nodes = []
     index = 0
     
-    # Traverse all nodes
-    for node in root.xpath("//node"):
-        # Get basic attributes
+    # Stream all nodes
+    for node in iter_nodes(xml_path):
+        # Get identifying attributes
         resource_id = node.get("resource-id", "")
         text = node.get("text", "")
         content_desc = node.get("content-desc", "")
+        
+        # Skip nodes without any identifying information
+        if not (resource_id or text or content_desc):
+            continue
+        
+        # Class names and ids repeat across the dump; share one copy each
+        resource_id = sys.intern(resource_id)
+        
+        # Get remaining attributes only for kept nodes
         clickable = node.get("clickable", "false") == "true"
         bounds = node.get("bounds", "")
-        ui_class = node.get("class", "")
+        ui_class = sys.intern(node.get("class", ""))
         enabled = node.get("enabled", "false") == "true"
         focusable = node.get("focusable", "false") == "true"
         scrollable = node.get("scrollable", "false") == "true"
@@ -72,10 +196,6 @@ def parse_for_llm(xml_path: str) -> List[Dict[str, Any]]:
         password = node.get("password", "false") == "true"
         selected = node.get("selected", "false") == "true"
         
-        # Skip nodes without any identifying information
-        if not (resource_id or text or content_desc):
-            continue
-            
         # Determine element type from class name
         element_type = _get_element_type(ui_class)
         
@@ -126,8 +246,12 @@ def parse_for_llm(xml_path: str) -> List[Dict[str, Any]]:
     return nodes
 
 
+@lru_cache(maxsize=512)
 def _get_element_type(class_name: str) -> str:
-    """Determine user-friendly element type from Android class name."""
+    """
+    Determine user-friendly element type from Android class name.
+    Memoized, since most nodes share a handful of class names.
+    """
     class_lower = class_name.lower()
     
     if "button" in class_lower:
@@ -174,7 +298,7 @@ def _create_label(text: str, content_desc: str, resource_id: str, element_type:
             # Replace underscores and camelCase with spaces
             label = id_part.replace("_", " ").replace("-", " ")
             # Add spaces before capital letters in camelCase
-            label = re.sub(r'(?<!^)(?=[A-Z])', ' ', label).lower()
+            label = _CAMEL_RE.sub(' ', label).lower()
             return f"{label} {element_type}".strip()
         else:
             return f"{resource_id} {element_type}"
@@ -183,11 +307,15 @@ def _create_label(text: str, content_desc: str, resource_id: str, element_type:
 
 
 def _parse_bounds(bounds_str: str) -> Tuple[int, int, int, int]:
-    """Parse bounds string '[x1,y1][x2,y2]' into tuple of ints."""
-    match = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', bounds_str)
-    if not match:
-        raise ValueError(f"Invalid bounds format: {bounds_str}")
-    return tuple(map(int, match.groups()))
+    """
+    Parse bounds string '[x1,y1][x2,y2]' into tuple of ints.
+    Uses plain string splitting for the fixed shape; raises ValueError
+    if the string is malformed.
+    """
+    first, second = bounds_str[1:-1].split("][", 1)
+    x1, y1 = first.split(",", 1)
+    x2, y2 = second.split(",", 1)
+    return int(x1), int(y1), int(x2), int(y2)
 
 
 def parse_minimal_for_llm(xml_path: str) -> Dict[str, Any]:
@@ -203,14 +331,11 @@ def parse_minimal_for_llm(xml_path: str) -> Dict[str, Any]:
     Returns:
     - Compact JSON with only actionable elements
     """
-    tree = etree.parse(xml_path)
-    root = tree.getroot()
-    
     elements = []
     seen_elements = set()  # Track duplicates
     index = 0
     
-    for node in root.xpath("//node"):
+    for node in iter_nodes(xml_path):
         # Skip if not enabled
         if node.get("enabled", "false") != "true":
             continue
@@ -233,7 +358,7 @@ def parse_minimal_for_llm(xml_path: str) -> Dict[str, Any]:
             continue
             
         # Create unique identifier to detect duplicates
-        element_key = f"{text}|{content_desc}|{resource_id}|{clickable}"
+        element_key = (text, content_desc, resource_id, clickable)
         if element_key in seen_elements:
             continue
         seen_elements.add(element_key)
@@ -288,42 +413,32 @@ def _group_similar_elements(elements: List[Dict]) -> List[Dict]:
         return elements
     
     grouped = []
-    i = 0
     
-    while i < len(elements):
-        current = elements[i]
-        
-        # Look for patterns (same type elements in sequence)
-        if i + 2 < len(elements):
-            next1 = elements[i + 1]
-            next2 = elements[i + 2]
+    # Single pass over runs of same-type elements
+    for elem_type, run in groupby(elements, key=lambda e: e.get("t")):
+        run = list(run)
+        k = 0
+        while k < len(run):
+            current = run[k]
             
-            # Check if we have a pattern
-            if (current.get("t") == next1.get("t") == next2.get("t") and
-                current.get("c") == next1.get("c") == next2.get("c")):
-                
-                # Collect all similar items
-                similar_items = [current["l"]]
-                j = i + 1
-                
-                while j < len(elements) and elements[j].get("t") == current.get("t"):
-                    similar_items.append(elements[j]["l"])
-                    j += 1
+            # Three in a row with the same clickability start a list,
+            # which then takes the rest of the same-type run
+            if (k + 2 < len(run) and
+                current.get("c") == run[k + 1].get("c") == run[k + 2].get("c")):
+                similar_items = [e["l"] for e in run[k:]]
                 
                 # Create grouped element
                 grouped.append({
                     "i": current["i"],
                     "t": "L",  # List type
-                    "l": f"List of {len(similar_items)} {current.get('t')} items",
+                    "l": f"List of {len(similar_items)} {elem_type} items",
                     "items": similar_items[:5],  # Show first 5 only
                     "h": "select"
                 })
-                
-                i = j
-                continue
-        
-        grouped.append(current)
-        i += 1
+                break
+            
+            grouped.append(current)
+            k += 1
     
     return grouped
 
@@ -333,21 +448,12 @@ def _generate_element_map(elements: List[Dict]) -> Dict[str, List[int]]:
     Generate a quick lookup map for common UI patterns.
     Helps LLM quickly find elements by intent.
     """
-    patterns = {
-        "auth": ["login", "sign in", "password", "username", "email"],
-        "nav": ["back", "home", "menu", "settings", "profile"],
-        "action": ["submit", "save", "cancel", "ok", "done", "next"],
-        "search": ["search", "find", "filter", "query"]
-    }
-    
     element_map = {}
+    labels_lower = [elem.get("l", "").lower() for elem in elements]
     
-    for pattern_name, keywords in patterns.items():
-        matches = []
-        for elem in elements:
-            label_lower = elem.get("l", "").lower()
-            if any(keyword in label_lower for keyword in keywords):
-                matches.append(elem["i"])
+    for pattern_name, pattern_re in _ELEMENT_MAP_RES:
+        matches = [elem["i"] for elem, label_lower in zip(elements, labels_lower)
+                   if pattern_re.search(label_lower)]
         
         if matches:
             element_map[pattern_name] = matches
@@ -376,22 +482,24 @@ def parse_hierarchical_for_llm(xml_path: str) -> Dict[str, Any]:
         "navigation_map": {}
     }
     
-    # Process root node to build tree
-    _process_node_hierarchical(root, screen_hierarchy)
+    # Process root node to build tree; sections are bucketed by priority
+    section_buckets = _new_section_buckets()
+    _process_node_hierarchical(root, screen_hierarchy, section_buckets, index_counter=[0],
+                               sibling_counts={})
     
     # Post-process to identify sections
-    screen_hierarchy["sections"] = _identify_screen_sections(screen_hierarchy)
+    screen_hierarchy["sections"] = _identify_screen_sections(section_buckets)
     
-    # Create a flat list of actionable elements with context
-    actionable = _extract_actionable_with_context(screen_hierarchy["sections"])
+    # Collect actionable elements with context, forms and lists in one walk
+    actionable, forms, lists = _walk_sections(screen_hierarchy["sections"])
     
     # Build the final structure
     result = {
         "screen": {
             "sections": screen_hierarchy["sections"],
             "quick_actions": _get_quick_actions(actionable),
-            "forms": _identify_forms(screen_hierarchy["sections"]),
-            "lists": _identify_lists(screen_hierarchy["sections"])
+            "forms": forms,
+            "lists": lists
         },
         "elements": actionable,
         "count": len(actionable),
@@ -401,8 +509,16 @@ def parse_hierarchical_for_llm(xml_path: str) -> Dict[str, Any]:
     return result
 
 
-def _process_node_hierarchical(node, parent_dict, depth=0, index_counter=[0]):
-    """Recursively process XML nodes to build hierarchy"""
+def _process_node_hierarchical(node, parent_dict, section_buckets, depth=0, index_counter=[0],
+                               sibling_counts=None):
+    """
+    Recursively process XML nodes to build hierarchy.
+    Every node is visited once. Actionable elements go to the nearest
+    enclosing container; each container with elements is appended to the
+    bucket for its type priority in section_buckets, which the caller
+    creates with _new_section_buckets (see _identify_screen_sections).
+    sibling_counts memoizes per-parent child class tallies for one parse.
+    """
     # Skip if depth is too deep (avoid UI noise)
     if depth > 10:
         return
@@ -416,6 +532,9 @@ def _process_node_hierarchical(node, parent_dict, depth=0, index_counter=[0]):
     ui_class = node.get("class", "")
     bounds = node.get("bounds", "")
     
+    # Materialize the children once; used for the emptiness check and the walk
+    children = list(node)
+    
     # Determine element type
     element_type = _get_element_type(ui_class)
     
@@ -424,7 +543,7 @@ def _process_node_hierarchical(node, parent_dict, depth=0, index_counter=[0]):
     has_identity = bool(text or content_desc or resource_id)
     
     # Process based on type
-    if is_container and len(node) > 0:  # Has children
+    if is_container and children:
         # Create a container section
         container = {
             "type": _get_container_type(resource_id, ui_class),
@@ -432,24 +551,24 @@ def _process_node_hierarchical(node, parent_dict, depth=0, index_counter=[0]):
             "id": resource_id.split("/")[-1] if "/" in resource_id else ""
         }
         
-        # Process children
-        for child in node:
-            _process_node_hierarchical(child, container, depth + 1, index_counter)
+        # Process children into this container only
+        for child in children:
+            _process_node_hierarchical(child, container, section_buckets, depth + 1, index_counter,
+                                       sibling_counts)
         
         # Only add non-empty containers
         if container["children"]:
-            if "sections" not in parent_dict:
-                parent_dict["sections"] = []
-            parent_dict["sections"].append(container)
-            
-    elif (clickable or element_type in ["input", "button"]) and enabled and has_identity:
+            section_buckets[_SECTION_PRIORITY.get(container["type"], -1)].append(container)
+        return
+    
+    if (clickable or element_type in ["input", "button"]) and enabled and has_identity:
         # This is an actionable element
         element = {
             "idx": index_counter[0],
             "type": element_type,
             "label": _create_label(text, content_desc, resource_id, element_type),
             "action": _get_action_type(element_type, clickable),
-            "context": _get_element_context(node, depth)
+            "context": _get_element_context(node, depth, sibling_counts, ui_class)
         }
         
         # Add bounds for spatial understanding
@@ -466,9 +585,10 @@ def _process_node_hierarchical(node, parent_dict, depth=0, index_counter=[0]):
             parent_dict["children"] = []
         parent_dict["children"].append(element)
     
-    # Process remaining children even if current node isn't added
-    for child in node:
-        _process_node_hierarchical(child, parent_dict, depth + 1, index_counter)
+    # Descend into non-container nodes, keeping the current parent
+    for child in children:
+        _process_node_hierarchical(child, parent_dict, section_buckets, depth + 1, index_counter,
+                                   sibling_counts)
 
 
 def _get_container_type(resource_id: str, ui_class: str) -> str:
@@ -476,20 +596,13 @@ def _get_container_type(resource_id: str, ui_class: str) -> str:
     id_lower = resource_id.lower()
     class_lower = ui_class.lower()
     
-    if any(x in id_lower for x in ["toolbar", "actionbar", "header", "appbar"]):
-        return "header"
-    elif any(x in id_lower for x in ["bottom", "navigation", "tab"]):
-        return "navigation"
-    elif any(x in id_lower for x in ["form", "input", "login", "signup"]):
-        return "form"
-    elif any(x in id_lower for x in ["list", "recycler", "grid"]):
-        return "list"
-    elif any(x in id_lower for x in ["dialog", "modal", "popup"]):
-        return "dialog"
-    elif "scroll" in class_lower:
+    for container_type, container_re in _CONTAINER_RES:
+        if container_re.search(id_lower):
+            return container_type
+    
+    if "scroll" in class_lower:
         return "content"
-    else:
-        return "section"
+    return "section"
 
 
 def _get_action_type(element_type: str, clickable: bool) -> str:
@@ -506,22 +619,30 @@ def _get_action_type(element_type: str, clickable: bool) -> str:
         return "interact"
 
 
-def _get_element_context(node, depth: int) -> Dict[str, Any]:
-    """Get context information about element's position in hierarchy"""
+def _get_element_context(node, depth: int, sibling_counts: Optional[Dict] = None,
+                         ui_class: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get context information about element's position in hierarchy.
+    ui_class may be passed when the caller has already read it.
+    """
     parent = node.getparent()
     if parent is not None:
         parent_class = parent.get("class", "")
         parent_type = _get_element_type(parent_class)
         
-        # Count siblings of same type
-        siblings = parent.findall(".//node")
-        same_type_count = sum(1 for s in siblings if s.get("class") == node.get("class"))
+        # Count direct siblings by class, once per parent. The memo is keyed
+        # on the element itself (not id()) so its lxml proxy stays alive.
+        class_counts = sibling_counts.get(parent) if sibling_counts is not None else None
+        if class_counts is None:
+            class_counts = Counter(s.get("class", "") for s in parent.iterchildren("node"))
+            if sibling_counts is not None:
+                sibling_counts[parent] = class_counts
         
         return {
             "parent_type": parent_type,
             "depth": depth,
-            "siblings_count": len(siblings),
-            "same_type_siblings": same_type_count
+            "siblings_count": sum(class_counts.values()),
+            "same_type_siblings": class_counts[node.get("class", "") if ui_class is None else ui_class]
         }
     
     return {"depth": depth}
@@ -536,144 +657,71 @@ def _get_position_description(x1: int, y1: int, x2: int, y2: int) -> str:
     center_x = (x1 + x2) / 2
     center_y = (y1 + y2) / 2
     
-    # Determine horizontal position
+    # Horizontal band: 0=left, 1=center, 2=right
     if center_x < screen_width * 0.33:
-        h_pos = "left"
+        h_pos = 0
     elif center_x > screen_width * 0.67:
-        h_pos = "right"
+        h_pos = 2
     else:
-        h_pos = "center"
+        h_pos = 1
     
-    # Determine vertical position
+    # Vertical band: 0=top, 1=middle, 2=bottom
     if center_y < screen_height * 0.2:
-        v_pos = "top"
+        v_pos = 0
     elif center_y > screen_height * 0.8:
-        v_pos = "bottom"
+        v_pos = 2
     else:
-        v_pos = "middle"
-    
-    if h_pos == "center" and v_pos == "middle":
-        return "center"
-    elif v_pos == "middle":
-        return h_pos
-    elif h_pos == "center":
-        return v_pos
-    else:
-        return f"{v_pos}-{h_pos}"
-
-
-def _identify_screen_sections(hierarchy: Dict) -> List[Dict]:
-    """Organize the hierarchy into logical screen sections"""
-    sections = hierarchy.get("sections", [])
-    
-    # Sort sections by type priority
-    section_priority = {
-        "header": 1,
-        "navigation": 2,
-        "form": 3,
-        "content": 4,
-        "list": 5,
-        "dialog": 0,  # Highest priority if present
-        "section": 6
-    }
-    
-    sorted_sections = sorted(sections, 
-                           key=lambda x: section_priority.get(x["type"], 99))
+        v_pos = 1
     
-    return sorted_sections
+    return _POSITION_NAMES[v_pos * 3 + h_pos]
 
 
-def _extract_actionable_with_context(sections: List[Dict]) -> List[Dict]:
-    """Extract all actionable elements with their section context"""
-    actionable = []
-    
-    for section in sections:
-        section_type = section["type"]
-        _extract_from_section(section, actionable, section_type)
-    
-    return actionable
+def _new_section_buckets() -> List[List[Dict]]:
+    """One list per section priority, plus a last one for unknown types"""
+    return [[] for _ in range(len(_SECTION_PRIORITY) + 1)]
 
 
-def _extract_from_section(section: Dict, actionable: List, parent_section: str):
-    """Recursively extract actionable elements"""
-    if "children" in section:
-        for child in section["children"]:
-            if isinstance(child, dict):
-                if "action" in child:  # It's an actionable element
-                    child["section"] = parent_section
-                    actionable.append(child)
-                else:  # It might be a nested section
-                    _extract_from_section(child, actionable, parent_section)
+def _identify_screen_sections(section_buckets: List[List[Dict]]) -> List[Dict]:
+    """Organize the hierarchy into logical screen sections"""
+    # Buckets are already in type priority order; keep discovery order within each
+    return [section for bucket in section_buckets for section in bucket]
 
 
-def _identify_forms(sections: List[Dict]) -> List[Dict]:
-    """Identify form-like structures"""
+def _walk_sections(sections: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Single pass over the screen sections.
+    Returns actionable elements (tagged with their section type),
+    form-like structures and list structures.
+    """
+    actionable = []
     forms = []
+    lists = []
     
     for section in sections:
-        if section["type"] == "form":
+        section_type = section["type"]
+        inputs = []
+        _extract_from_section(section, actionable, section_type, inputs)
+        
+        if section_type == "form":
             forms.append({
                 "type": "explicit_form",
-                "fields": _get_form_fields(section)
+                "fields": [{
+                    "idx": e["idx"],
+                    "label": e["label"],
+                    "required": "required" in e.get("label", "").lower()
+                } for e in inputs]
             })
-        else:
-            # Look for implicit forms (multiple inputs together)
-            inputs = _find_inputs_in_section(section)
-            if len(inputs) >= 2:
-                forms.append({
-                    "type": "implicit_form",
-                    "fields": inputs
-                })
-    
-    return forms
-
-
-def _get_form_fields(section: Dict) -> List[Dict]:
-    """Extract form fields from a section"""
-    fields = []
-    
-    def extract_fields(node):
-        if "children" in node:
-            for child in node["children"]:
-                if child.get("type") == "input":
-                    fields.append({
-                        "idx": child["idx"],
-                        "label": child["label"],
-                        "required": "required" in child.get("label", "").lower()
-                    })
-                elif "children" in child:
-                    extract_fields(child)
-    
-    extract_fields(section)
-    return fields
-
-
-def _find_inputs_in_section(section: Dict) -> List[Dict]:
-    """Find all input elements in a section"""
-    inputs = []
-    
-    def find_inputs(node):
-        if "children" in node:
-            for child in node["children"]:
-                if child.get("type") == "input":
-                    inputs.append({
-                        "idx": child["idx"],
-                        "label": child["label"]
-                    })
-                elif isinstance(child, dict):
-                    find_inputs(child)
-    
-    find_inputs(section)
-    return inputs
-
-
-def _identify_lists(sections: List[Dict]) -> List[Dict]:
-    """Identify list structures"""
-    lists = []
-    
-    for section in sections:
-        if section["type"] == "list":
-            items = _get_list_items(section)
+        elif len(inputs) >= 2:
+            # Implicit form (multiple inputs together)
+            forms.append({
+                "type": "implicit_form",
+                "fields": [{"idx": e["idx"], "label": e["label"]} for e in inputs]
+            })
+        
+        if section_type == "list":
+            items = [{"idx": child["idx"], "label": child["label"]}
+                     for child in section.get("children", ())
+                     if child.get("action") == "click"]
             if items:
                 lists.append({
                     "type": "list",
@@ -681,42 +729,32 @@ def _identify_lists(sections: List[Dict]) -> List[Dict]:
                     "sample_items": items[:3]  # First 3 as sample
                 })
     
-    return lists
+    return actionable, forms, lists
 
 
-def _get_list_items(section: Dict) -> List[Dict]:
-    """Extract list items"""
-    items = []
-    
+def _extract_from_section(section: Dict, actionable: List, parent_section: str,
+                          inputs: List):
+    """Recursively extract actionable elements, noting inputs separately"""
     if "children" in section:
         for child in section["children"]:
-            if child.get("action") == "click":
-                items.append({
-                    "idx": child["idx"],
-                    "label": child["label"]
-                })
-    
-    return items
+            if isinstance(child, dict):
+                if "action" in child:  # It's an actionable element
+                    child["section"] = parent_section
+                    actionable.append(child)
+                    if child.get("type") == "input":
+                        inputs.append(child)
+                else:  # It might be a nested section
+                    _extract_from_section(child, actionable, parent_section, inputs)
 
 
 def _get_quick_actions(elements: List[Dict]) -> List[Dict]:
     """Identify common quick actions"""
     quick_actions = []
     
-    # Common action keywords
-    action_keywords = {
-        "submit": ["submit", "send", "post", "save", "confirm"],
-        "cancel": ["cancel", "close", "dismiss", "back"],
-        "auth": ["login", "sign in", "log in", "signin"],
-        "search": ["search", "find", "filter"],
-        "add": ["add", "create", "new", "plus"],
-        "settings": ["settings", "preferences", "config"]
-    }
-    
     for element in elements:
         label_lower = element["label"].lower()
-        for action_type, keywords in action_keywords.items():
-            if any(keyword in label_lower for keyword in keywords):
+        for action_type, action_re in _QUICK_ACTION_RES:
+            if action_re.search(label_lower):
                 quick_actions.append({
                     "idx": element["idx"],
                     "type": action_type,
@@ -750,4 +788,13 @@ def _generate_suggestions(elements: List[Dict]) -> Dict[str, Any]:
             "fields": [e["idx"] for e in auth_elements]
         }
     
-    return suggestions
\ No newline at end of file
+    return suggestions
+
+
+def to_json(obj: Any) -> str:
+    """
+    Compact JSON for parser output, e.g. before sending it to an LLM.
+    No indentation or spaces after separators, and non-ASCII text is
+    kept as is rather than escaped.
+    """
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
@@ -1,9 +1,28 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import copy
 import os
+import re
 import json
+import hashlib
+import tempfile
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 
 
+# Keys every analysis result (and so every disk cache entry) must have
+_ANALYSIS_FIELDS = ("action", "element_index", "reason", "confidence")
+
+# Goal/label tokenization for the local shortcut
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "the", "to", "on", "in", "of", "for", "and", "or", "my", "me",
+    "i", "it", "is", "be", "go", "tap", "click", "press", "open", "select",
+    "please", "then", "with", "button"
+})
+
+
 def choose_node(nodes: List[Dict[str, Any]], user_goal: str = None) -> Optional[Dict[str, str]]:
     """
     Choose which node to interact with based on user goal.
@@ -34,6 +53,8 @@ def choose_node_stub(nodes: List[Dict[str, Any]]) -> Optional[Dict[str, str]]:
     """
     Original stub: Pick the first clickable node that has non-empty text.
     """
+    fallback = None
+    
     for node in nodes:
         # Only consider clickable nodes
         if not node.get("clickable", False):
@@ -41,25 +62,146 @@ def choose_node_stub(nodes: List[Dict[str, Any]]) -> Optional[Dict[str, str]]:
             
         # Pick first node with non-empty text
         if node.get("text"):
-            return {
-                "resource-id": node.get("resource-id", ""),
-                "text": node.get("text", ""),
-                "content-desc": node.get("content-desc", "")
-            }
+            chosen = node
+            break
+        
+        # Remember first clickable node with any identifier as fallback
+        if fallback is None and (node.get("resource-id") or node.get("content-desc")):
+            fallback = node
+    else:
+        chosen = fallback
+    
+    if chosen is None:
+        return None
+    
+    return {
+        "resource-id": chosen.get("resource-id", ""),
+        "text": chosen.get("text", ""),
+        "content-desc": chosen.get("content-desc", "")
+    }
+
+
+@lru_cache(maxsize=8)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> List[Dict[str, Any]]:
+    """
+    parse_for_llm memoized on path, modification time and size, so
+    consecutive planner calls on an unchanged dump parse it once. The size
+    catches a rewrite within one timestamp tick. The returned list is
+    shared between callers and must not be modified; copy nodes before
+    handing them out.
+    """
+    from .parser import parse_for_llm
+    return parse_for_llm(path)
+
+
+def _load_nodes(xml_path: Path) -> List[Dict[str, Any]]:
+    """Parsed LLM nodes for a dump, from the cache while the file is unchanged"""
+    stat = xml_path.stat()
+    return _parse_cached(str(xml_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _analyze_with_cache(llm, screen_dump: Dict[str, Any], user_goal: str) -> Dict[str, Any]:
+    """
+    Run llm.analyze_screen, reusing earlier results stored on disk when
+    TESTME_LLM_CACHE=1. Entries live in ~/.cache/testme/llm/<key>.json,
+    keyed on a hash of the screen dump and goal. Entries that are not a
+    complete analysis dict are treated as misses.
+    """
+    if os.getenv("TESTME_LLM_CACHE") != "1":
+        return llm.analyze_screen(screen_dump, user_goal)
+    
+    from .parser import to_json
+    
+    payload = to_json(screen_dump).encode("utf-8") + b"|" + user_goal.encode("utf-8")
+    key = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    cache_path = Path.home() / ".cache" / "testme" / "llm" / f"{key}.json"
+    
+    try:
+        cached = json.loads(cache_path.read_text())
+        if isinstance(cached, dict) and all(field in cached for field in _ANALYSIS_FIELDS):
+            return cached
+    except (OSError, json.JSONDecodeError):
+        pass
     
-    # Fallback: pick first clickable node with any identifier
+    result = llm.analyze_screen(screen_dump, user_goal)
+    
+    # Write to a temp file and rename it into place, so a concurrent run
+    # never reads a half-written entry
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass  # Caching is best effort
+    
+    return result
+
+
+def _screen_summary(nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Screen dump for the LLM: elements plus clickable and per-type counts in one pass"""
+    element_types = Counter()
+    clickable = 0
     for node in nodes:
-        if not node.get("clickable", False):
+        element_types[node["type"]] += 1
+        clickable += node["clickable"]
+    
+    return {
+        "screen_elements": nodes,
+        "total_elements": len(nodes),
+        "clickable_elements": clickable,
+        "element_types": dict(element_types)
+    }
+
+
+def _tokens(text: str) -> set:
+    """Lowercased word tokens without stopwords"""
+    return set(_WORD_RE.findall(text.lower())) - _STOPWORDS
+
+
+def _local_shortcut(nodes: List[Dict[str, Any]], user_goal: str) -> Optional[Dict[str, Any]]:
+    """
+    Decision for the clickable node whose label shares the most words with
+    the goal, if it shares at least 2 and strictly more than any other
+    clickable node. Other nodes may match too, just less well. None means
+    the choice is not obvious and the LLM should decide.
+    
+    The result has the same keys as an LLM analysis, plus "source": "local".
+    """
+    goal_tokens = _tokens(user_goal)
+    if len(goal_tokens) < 2:
+        return None
+    
+    best_index = None
+    best_score = 0
+    runner_up = 0
+    for index, node in enumerate(nodes):
+        if not node["clickable"]:
             continue
-            
-        if node.get("resource-id") or node.get("content-desc"):
-            return {
-                "resource-id": node.get("resource-id", ""),
-                "text": node.get("text", ""),
-                "content-desc": node.get("content-desc", "")
-            }
+        score = len(goal_tokens & _tokens(node["label"]))
+        if score > best_score:
+            best_index, best_score, runner_up = index, score, best_score
+        elif score > runner_up:
+            runner_up = score
+    
+    if best_score < 2 or best_score <= runner_up:
+        return None
     
-    return None
+    # Share of the goal's words matched, scaled to 0.5-0.9: a word match is
+    # never as certain as an LLM decision
+    confidence = round(0.5 + 0.4 * best_score / len(goal_tokens), 2)
+    return {
+        "action": "type" if nodes[best_index]["type"] == "input" else "click",
+        "element_index": best_index,
+        "reason": f"Best local label match (score {best_score}, next best {runner_up})",
+        "confidence": confidence,
+        "source": "local"
+    }
 
 
 def choose_node_with_llm(nodes: List[Dict[str, Any]], user_goal: str) -> Optional[Dict[str, str]]:
@@ -72,32 +214,23 @@ def choose_node_with_llm(nodes: List[Dict[str, Any]], user_goal: str) -> Optiona
     else:
         from .llm_client import get_llm_client
     
-    from .parser import parse_for_llm
-    
     # Get the latest screen dump file
     xml_path = Path.cwd() / "window_dump.xml"
     if not xml_path.exists():
         raise FileNotFoundError("window_dump.xml not found")
     
-    # Parse to LLM format
-    llm_nodes = parse_for_llm(str(xml_path))
-    
-    # Create screen summary
-    screen_dump = {
-        "screen_elements": llm_nodes,
-        "total_elements": len(llm_nodes),
-        "clickable_elements": sum(1 for n in llm_nodes if n["clickable"]),
-        "element_types": {}
-    }
-    
-    # Count element types
-    for node in llm_nodes:
-        elem_type = node["type"]
-        screen_dump["element_types"][elem_type] = screen_dump["element_types"].get(elem_type, 0) + 1
+    # Parse to LLM format (reused while the dump file is unchanged)
+    llm_nodes = _load_nodes(xml_path)
     
-    # Get LLM decision
-    llm = get_llm_client()
-    result = llm.analyze_screen(screen_dump, user_goal)
+    # Skip the LLM when one clickable element clearly matches the goal best
+    result = _local_shortcut(llm_nodes, user_goal)
+    if result is None:
+        # Create screen summary
+        screen_dump = _screen_summary(llm_nodes)
+        
+        # Get LLM decision
+        llm = get_llm_client()
+        result = _analyze_with_cache(llm, screen_dump, user_goal)
     
     # Find the selected element
     element_index = result["element_index"]
@@ -105,8 +238,9 @@ def choose_node_with_llm(nodes: List[Dict[str, Any]], user_goal: str) -> Optiona
         selected_node = llm_nodes[element_index]
         identifiers = selected_node["identifiers"]
         
-        # Log the decision
-        print(f"\nLLM Decision:")
+        # Log the decision, and whether the LLM made it
+        source = "Local" if result.get("source") == "local" else "LLM"
+        print(f"\n{source} Decision:")
         print(f"- Action: {result['action']}")
         print(f"- Element: {selected_node['label']} (index {element_index})")
         print(f"- Reason: {result['reason']}")
@@ -131,41 +265,100 @@ def analyze_screen_for_goal(user_goal: str) -> Dict[str, Any]:
     Returns:
         Dict with action details and selected element
     """
+    llm, nodes, screen_dump = _prepare_screen_analysis()
+    
+    # Get LLM analysis
+    result = _analyze_with_cache(llm, screen_dump, user_goal)
+    
+    return _attach_element(result, nodes)
+
+
+async def analyze_screen_for_goal_async(user_goal: str) -> Dict[str, Any]:
+    """
+    Async variant of analyze_screen_for_goal.
+    
+    The current dump is read before the first await. Creating the LLM
+    client (which may set up credentials) and the blocking LLM request
+    run in a worker thread. Callers can therefore capture the next screen
+    concurrently, e.g.
+    asyncio.gather(analyze_screen_for_goal_async(goal), dump_next_screen()).
+    """
+    nodes, screen_dump = _load_current_screen()
+    
+    # Get LLM analysis without blocking the event loop
+    result = await asyncio.to_thread(_analyze_in_worker, screen_dump, user_goal)
+    
+    return _attach_element(result, nodes)
+
+
+def _analyze_in_worker(screen_dump: Dict[str, Any], user_goal: str) -> Dict[str, Any]:
+    """Fetch the LLM client and analyze; run off the event loop"""
+    return _analyze_with_cache(_get_llm_client(), screen_dump, user_goal)
+
+
+def _prepare_screen_analysis() -> Tuple[Any, List[Dict[str, Any]], Dict[str, Any]]:
+    """LLM client, parsed nodes and screen summary for the current dump"""
+    nodes, screen_dump = _load_current_screen()
+    return _get_llm_client(), nodes, screen_dump
+
+
+def _get_llm_client():
+    """LLM client for the configured backend"""
     # Try simple API key method first
     if os.getenv("GOOGLE_AI_API_KEY"):
         from .llm_client_simple import get_simple_llm_client as get_llm_client
     else:
         from .llm_client import get_llm_client
     
-    from .parser import parse_for_llm
-    
+    return get_llm_client()
+
+
+def _load_current_screen() -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Parsed nodes and screen summary for the current dump"""
     # Get the latest screen dump
     xml_path = Path.cwd() / "window_dump.xml"
     if not xml_path.exists():
         raise FileNotFoundError("Run 'dump' command first to capture screen")
     
-    # Parse to LLM format
-    nodes = parse_for_llm(str(xml_path))
+    # Parse to LLM format (reused while the dump file is unchanged)
+    nodes = _load_nodes(xml_path)
     
     # Create screen summary
-    screen_dump = {
-        "screen_elements": nodes,
-        "total_elements": len(nodes),
-        "clickable_elements": sum(1 for n in nodes if n["clickable"]),
-        "element_types": {}
-    }
+    return nodes, _screen_summary(nodes)
+
+
+def _attach_element(result: Dict[str, Any], nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add element details (a copy; nodes may be cached) to an analysis result"""
+    if 0 <= result["element_index"] < len(nodes):
+        result["element"] = copy.deepcopy(nodes[result["element_index"]])
     
-    # Count element types
-    for node in nodes:
-        elem_type = node["type"]
-        screen_dump["element_types"][elem_type] = screen_dump["element_types"].get(elem_type, 0) + 1
+    return result
+
+
+def plan_sequence(user_goal: str, max_steps: int = 5) -> List[Dict[str, Any]]:
+    """
+    Plan several actions for a goal on the current screen with one LLM request.
     
-    # Get LLM analysis
-    llm = get_llm_client()
-    result = llm.analyze_screen(screen_dump, user_goal)
+    Args:
+        user_goal: What the user wants to achieve
+        max_steps: Maximum number of steps to plan
+        
+    Returns:
+        Ordered list of step dicts (action, element_index, reason, confidence,
+        optional text_input), each with its selected element. Steps may
+        change the screen, so callers should dump again and replan when a
+        step has low confidence or the screen no longer matches.
+    """
+    llm, nodes, screen_dump = _prepare_screen_analysis()
     
-    # Add element details to result
-    if 0 <= result["element_index"] < len(nodes):
-        result["element"] = nodes[result["element_index"]]
+    # Get the whole plan in one request
+    steps = llm.plan_steps(screen_dump, user_goal, max_steps)
+    
+    # Keep steps up to the first one that points outside the screen
+    planned = []
+    for step in steps:
+        if not 0 <= step["element_index"] < len(nodes):
+            break
+        planned.append(dict(step, element=copy.deepcopy(nodes[step["element_index"]])))
     
-    return result
\ No newline at end of file
+    return planned
@@ -3,7 +3,8 @@ Semantic tree parser - Groups UI elements by their semantic relationships
 """
 from lxml import etree
 from typing import Dict, List, Any, Optional, Tuple
-import re
+from functools import lru_cache
+import sys
 
 
 def build_tree(xml_str: str) -> Dict[str, Any]:
@@ -19,7 +20,7 @@ def build_tree(xml_str: str) -> Dict[str, Any]:
     # Pass 2: Add synthetic form groups
     _create_form_groups(tree_root)
     
-    # Pass 3: Prune and clean
+    # Pass 3: Flatten and clean
     _prune_tree(tree_root)
     
     return {
@@ -27,54 +28,86 @@ def build_tree(xml_str: str) -> Dict[str, Any]:
     }
 
 
-def _build_node_tree(node) -> Dict[str, Any]:
-    """Build tree maintaining XML parent-child relationships"""
-    # Extract attributes
-    attrs = dict(node.attrib)
+def _build_node_tree(root) -> Dict[str, Any]:
+    """
+    Build tree maintaining XML parent-child relationships.
+    One root.iter() pass in document order; each node is attached to its
+    parent's dict (already built, since parents precede children).
+    Empty containers inside containers are dropped here rather than built
+    and pruned later.
+    """
+    tree_root = _make_tree_node(root)
+    if len(root):
+        tree_root["children"] = []
+    tree_nodes = {root: tree_root}
     
-    # Parse bounds
-    bounds = _parse_bounds(attrs.get("bounds", "[0,0][0,0]"))
+    for node in root.iter():
+        if node is root:
+            continue
+        parent = tree_nodes[node.getparent()]
+        tree_node = _make_tree_node(node)
+        has_children = len(node) > 0
+        
+        # Filter out empty containers
+        if (parent["type"] == "container" and tree_node["type"] == "container" and
+                not has_children and
+                not tree_node.get("text") and
+                not tree_node.get("clickable")):
+            continue
+        
+        if has_children:
+            tree_node["children"] = []
+            tree_nodes[node] = tree_node
+        parent["children"].append(tree_node)
+    
+    return tree_root
+
+
+def _make_tree_node(node) -> Dict[str, Any]:
+    """Build the dict for one XML node, without children"""
+    # Read only the attributes we use, without copying node.attrib
+    get = node.get
+    text = get("text")
+    content_desc = get("content-desc")
+    resource_id = get("resource-id")
+    clickable = get("clickable") == "true"
+    ui_class = get("class")
+    
+    # Class names and ids repeat across the dump; share one copy each
+    if ui_class:
+        ui_class = sys.intern(ui_class)
+    if resource_id:
+        resource_id = sys.intern(resource_id)
     
     # Build node
     tree_node = {
-        "type": _get_semantic_type(attrs),
-        "bounds": bounds
+        "type": _get_semantic_type(ui_class or "", clickable, bool(text)),
+        "bounds": _parse_bounds(get("bounds") or "[0,0][0,0]")
     }
     
     # Add important attributes
-    if attrs.get("text"):
-        tree_node["text"] = attrs["text"]
-    if attrs.get("content-desc"):
-        tree_node["contentDesc"] = attrs["content-desc"]
-    if attrs.get("resource-id"):
-        tree_node["resourceId"] = attrs["resource-id"]
-    if attrs.get("clickable") == "true":
+    if text:
+        tree_node["text"] = text
+    if content_desc:
+        tree_node["contentDesc"] = content_desc
+    if resource_id:
+        tree_node["resourceId"] = resource_id
+    if clickable:
         tree_node["clickable"] = True
-    if attrs.get("class"):
-        tree_node["className"] = attrs["class"]
-    
-    # Process children
-    children = []
-    for child in node:
-        child_node = _build_node_tree(child)
-        if child_node:  # Skip empty nodes
-            children.append(child_node)
-    
-    if children:
-        tree_node["children"] = children
+    if ui_class:
+        tree_node["className"] = ui_class
     
     return tree_node
 
 
-def _get_semantic_type(attrs: Dict[str, str]) -> str:
-    """Determine semantic type of element"""
-    class_name = attrs.get("class", "").lower()
-    clickable = attrs.get("clickable") == "true"
-    text = attrs.get("text", "")
+@lru_cache(maxsize=512)
+def _get_semantic_type(ui_class: str, clickable: bool, has_text: bool) -> str:
+    """Determine semantic type of element (memoized per class and flags)"""
+    class_name = ui_class.lower()
     
     if "edittext" in class_name or "textinput" in class_name:
         return "input"
-    elif "button" in class_name or (clickable and text):
+    elif "button" in class_name or (clickable and has_text):
         return "button"
     elif "textview" in class_name and not clickable:
         return "label"
@@ -91,11 +124,14 @@ def _get_semantic_type(attrs: Dict[str, str]) -> str:
 
 
 def _parse_bounds(bounds_str: str) -> List[int]:
-    """Parse bounds string to [x1, y1, x2, y2]"""
-    match = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', bounds_str)
-    if match:
-        return [int(x) for x in match.groups()]
-    return [0, 0, 0, 0]
+    """Parse bounds string to [x1, y1, x2, y2]; [0, 0, 0, 0] if malformed"""
+    try:
+        first, second = bounds_str[1:-1].split("][", 1)
+        x1, y1 = first.split(",", 1)
+        x2, y2 = second.split(",", 1)
+        return [int(x1), int(y1), int(x2), int(y2)]
+    except ValueError:
+        return [0, 0, 0, 0]
 
 
 def _create_form_groups(node: Dict[str, Any]):
@@ -112,17 +148,15 @@ def _create_form_groups(node: Dict[str, Any]):
             elif child["type"] == "input":
                 inputs.append(child)
             else:
-                # Recursively process other containers
-                if child.get("children"):
-                    _create_form_groups(child)
                 other_children.append(child)
         
         # Pair labels with nearby inputs
         new_children = []
         used_inputs = set()
+        input_geometry = _input_geometry(inputs)
         
         for label in labels:
-            nearest_input = _find_nearest_input(label, inputs, used_inputs)
+            nearest_input = _find_nearest_input(label, input_geometry, used_inputs)
             if nearest_input:
                 # Create form group
                 form_group = {
@@ -158,43 +192,46 @@ def _create_form_groups(node: Dict[str, Any]):
         # Update children
         node["children"] = new_children
     
-    # Process children recursively
+    # Process children recursively (once each, after this node's pairing)
     if node.get("children"):
         for child in node["children"]:
             _create_form_groups(child)
 
 
-def _find_nearest_input(label: Dict, inputs: List[Dict], used: set) -> Optional[Dict]:
+def _input_geometry(inputs: List[Dict]) -> List[Tuple[int, float, Dict]]:
+    """(top y, center x, input) per input, computed once per container"""
+    return [(inp["bounds"][1], (inp["bounds"][0] + inp["bounds"][2]) / 2, inp)
+            for inp in inputs]
+
+
+def _find_nearest_input(label: Dict, input_geometry: List[Tuple[int, float, Dict]],
+                        used: set) -> Optional[Dict]:
     """Find the nearest input below the label"""
-    if not inputs:
+    if not input_geometry:
         return None
     
     label_bounds = label["bounds"]
+    label_bottom = label_bounds[3]
+    label_center_x = (label_bounds[0] + label_bounds[2]) / 2
     min_distance = float('inf')
     nearest = None
     
-    for inp in inputs:
-        if id(inp) in used:
+    for inp_top, inp_center_x, inp in input_geometry:
+        # Input must start below the label (y1 of input > y2 of label) and
+        # be vertically close
+        distance = inp_top - label_bottom
+        if not 0 < distance < 100:
             continue
-            
-        inp_bounds = inp["bounds"]
         
-        # Check if input is below label (y1 of input > y2 of label)
-        if inp_bounds[1] > label_bounds[3]:
-            # Calculate vertical distance
-            distance = inp_bounds[1] - label_bounds[3]
-            
-            # Also check horizontal alignment
-            label_center_x = (label_bounds[0] + label_bounds[2]) / 2
-            inp_center_x = (inp_bounds[0] + inp_bounds[2]) / 2
-            x_distance = abs(label_center_x - inp_center_x)
-            
-            # Prefer vertically close and horizontally aligned
-            if distance < 100 and x_distance < 200:  # Thresholds
-                total_distance = distance + x_distance * 0.5
-                if total_distance < min_distance:
-                    min_distance = total_distance
-                    nearest = inp
+        # Also check horizontal alignment
+        x_distance = abs(label_center_x - inp_center_x)
+        
+        # Prefer vertically close and horizontally aligned
+        if x_distance < 200 and id(inp) not in used:  # Thresholds
+            total_distance = distance + x_distance * 0.5
+            if total_distance < min_distance:
+                min_distance = total_distance
+                nearest = inp
     
     return nearest
 
@@ -209,38 +246,31 @@ def _merge_bounds(b1: List[int], b2: List[int]) -> List[int]:
     ]
 
 
-def _prune_tree(node: Dict[str, Any]):
-    """Remove unnecessary attributes and empty containers"""
-    # Remove empty containers
-    if node.get("type") == "container" and node.get("children"):
-        # Filter out empty containers
-        node["children"] = [
-            child for child in node["children"]
-            if not (child.get("type") == "container" and 
-                   not child.get("children") and
-                   not child.get("text") and
-                   not child.get("clickable"))
-        ]
+def _prune_tree(root: Dict[str, Any]):
+    """
+    Remove unnecessary attributes and flatten single-child containers.
+    Empty containers were already dropped by _build_node_tree.
+    """
+    stack = [root]
+    
+    while stack:
+        node = stack.pop()
+        children = node.get("children")
         
         # Flatten single-child containers
-        if len(node["children"]) == 1 and node.get("type") == "container":
-            child = node["children"][0]
+        if node.get("type") == "container" and children and len(children) == 1:
+            child = children[0]
             # Preserve bounds from parent if child doesn't have them
             if not child.get("bounds") or child["bounds"] == [0, 0, 0, 0]:
                 child["bounds"] = node.get("bounds", [0, 0, 0, 0])
-    
-    # Recursively prune children
-    if node.get("children"):
-        for child in node["children"]:
-            _prune_tree(child)
         
-        # Remove empty children list
-        if not node["children"]:
-            del node["children"]
-    
-    # Remove className if not needed
-    if node.get("className") and node.get("type") != "element":
-        del node["className"]
+        # Prune children afterwards
+        if children:
+            stack.extend(children)
+        
+        # Remove className if not needed
+        if node.get("className") and node.get("type") != "element":
+            del node["className"]
 
 
 # For testing
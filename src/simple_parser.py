@@ -1,9 +1,15 @@
 """
 Simple, effective parser for Android UI that actually works
 """
-from lxml import etree
 from typing import Dict, List, Any, Tuple
 import re
+import sys
+from functools import lru_cache
+from .parser import iter_nodes
+
+
+# Keywords that mark login/auth elements
+_AUTH_RE = re.compile("login|sign in|password|username|email")
 
 
 def parse_ui_tree(xml_path: str) -> Dict[str, Any]:
@@ -11,15 +17,12 @@ def parse_ui_tree(xml_path: str) -> Dict[str, Any]:
     Parse Android UI into a simple tree structure that LLMs can understand.
     Focus on clarity and usefulness over complexity.
     """
-    tree = etree.parse(xml_path)
-    root = tree.getroot()
-    
     # Collect all interactive elements
     elements = []
     element_index = 0
     
-    # Process all nodes
-    for node in root.xpath("//node"):
+    # Stream all nodes in document order without keeping the DOM
+    for node in iter_nodes(xml_path):
         element_data = _extract_element_data(node, element_index)
         if element_data:
             elements.append(element_data)
@@ -28,16 +31,11 @@ def parse_ui_tree(xml_path: str) -> Dict[str, Any]:
     # Organize elements by screen position
     organized = _organize_by_position(elements)
     
-    # Identify patterns
-    patterns = _identify_patterns(elements)
+    # Count element kinds and identify patterns in one pass
+    summary, patterns = _summarize_elements(elements)
     
     return {
-        "summary": {
-            "total_elements": len(elements),
-            "clickable": len([e for e in elements if e.get("clickable")]),
-            "inputs": len([e for e in elements if e.get("type") == "input"]),
-            "buttons": len([e for e in elements if e.get("type") == "button"])
-        },
+        "summary": summary,
         "layout": organized,
         "patterns": patterns,
         "elements": elements
@@ -53,7 +51,7 @@ def _extract_element_data(node, index: int) -> Dict[str, Any]:
     clickable = node.get("clickable", "false") == "true"
     enabled = node.get("enabled", "false") == "true"
     focusable = node.get("focusable", "false") == "true"
-    ui_class = node.get("class", "")
+    ui_class = sys.intern(node.get("class", ""))  # Repeats across the dump
     bounds = node.get("bounds", "")
     
     # Skip if disabled or no identity
@@ -100,12 +98,13 @@ def _extract_element_data(node, index: int) -> Dict[str, Any]:
         "label": label,
         "clickable": clickable,
         "position": position,
-        "resource_id": resource_id.split("/")[-1] if "/" in resource_id else ""
+        "resource_id": sys.intern(resource_id.split("/")[-1]) if "/" in resource_id else ""
     }
 
 
+@lru_cache(maxsize=512)
 def _determine_type(ui_class: str, clickable: bool, focusable: bool) -> str:
-    """Determine element type from class and properties"""
+    """Determine element type from class and properties (memoized, runs per node)"""
     class_lower = ui_class.lower()
     
     if "edittext" in class_lower:
@@ -133,21 +132,22 @@ def _determine_type(ui_class: str, clickable: bool, focusable: bool) -> str:
 
 
 def _parse_bounds(bounds_str: str) -> Tuple[int, int, int, int]:
-    """Parse [x1,y1][x2,y2] format"""
-    match = re.match(r'\[(\d+),(\d+)\]\[(\d+),(\d+)\]', bounds_str)
-    if not match:
-        raise ValueError("Invalid bounds")
-    return tuple(map(int, match.groups()))
+    """Parse [x1,y1][x2,y2] format; raises ValueError if malformed"""
+    first, second = bounds_str[1:-1].split("][", 1)
+    x1, y1 = first.split(",", 1)
+    x2, y2 = second.split(",", 1)
+    return int(x1), int(y1), int(x2), int(y2)
 
 
 def _get_screen_area(x1: int, y1: int, x2: int, y2: int) -> str:
     """Determine which area of screen the element is in"""
-    center_y = (y1 + y2) / 2
+    # Compare twice the center y so the math stays in ints
+    center_y2 = y1 + y2
     
     # Rough screen divisions (assuming typical mobile screen)
-    if center_y < 200:
+    if center_y2 < 400:
         return "header"
-    elif center_y > 2000:  # Assuming ~2400px height
+    elif center_y2 > 4000:  # Assuming ~2400px height
         return "footer"
     else:
         return "content"
@@ -173,15 +173,42 @@ def _organize_by_position(elements: List[Dict]) -> Dict[str, List[Dict]]:
     return areas
 
 
-def _identify_patterns(elements: List[Dict]) -> Dict[str, Any]:
-    """Identify common UI patterns"""
+def _summarize_elements(elements: List[Dict]) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """Count element kinds and identify common UI patterns in a single pass"""
+    clickable_count = 0
+    button_count = 0
+    auth_elements = []
+    inputs = []
+    list_item_count = 0
+    
+    for e in elements:
+        elem_type = e["type"]
+        clickable = e.get("clickable")
+        
+        if clickable:
+            clickable_count += 1
+        if elem_type == "input":
+            inputs.append(e)
+        elif elem_type == "button":
+            button_count += 1
+        elif clickable:
+            # Candidate list item (clickable, not a button or input)
+            list_item_count += 1
+        
+        # Login/auth keywords
+        if _AUTH_RE.search(e["label"].lower()):
+            auth_elements.append(e)
+    
+    summary = {
+        "total_elements": len(elements),
+        "clickable": clickable_count,
+        "inputs": len(inputs),
+        "buttons": button_count
+    }
+    
     patterns = {}
     
     # Check for login/auth pattern
-    auth_keywords = ["login", "sign in", "password", "username", "email"]
-    auth_elements = [e for e in elements if any(
-        keyword in e["label"].lower() for keyword in auth_keywords
-    )]
     if auth_elements:
         patterns["authentication"] = {
             "detected": True,
@@ -189,7 +216,6 @@ def _identify_patterns(elements: List[Dict]) -> Dict[str, Any]:
         }
     
     # Check for form pattern (multiple inputs)
-    inputs = [e for e in elements if e["type"] == "input"]
     if len(inputs) >= 2:
         patterns["form"] = {
             "detected": True,
@@ -197,11 +223,10 @@ def _identify_patterns(elements: List[Dict]) -> Dict[str, Any]:
         }
     
     # Check for list pattern (multiple similar clickables)
-    clickables = [e for e in elements if e.get("clickable") and e["type"] not in ["button", "input"]]
-    if len(clickables) >= 5:
+    if list_item_count >= 5:
         patterns["list"] = {
             "detected": True,
-            "item_count": len(clickables)
+            "item_count": list_item_count
         }
     
-    return patterns
\ No newline at end of file
+    return summary, patterns
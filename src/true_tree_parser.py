@@ -2,10 +2,15 @@
 True tree parser - Maintains actual parent-child hierarchy from XML
 """
 from lxml import etree
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
 import re
 
 
+# Display text of a "text" node that has no visible text of its own
+_TEXT_PLACEHOLDER = "[text]"
+
+
 def parse_true_tree(xml_path: str) -> Dict[str, Any]:
     """
     Parse Android UI maintaining the true parent-child tree structure.
@@ -14,15 +19,15 @@ def parse_true_tree(xml_path: str) -> Dict[str, Any]:
     tree = etree.parse(xml_path)
     root = tree.getroot()
     
-    # Build the tree starting from root
-    ui_tree = _build_tree_node(root, element_id=[0])
-    
-    # Create flat index for quick lookup
-    flat_index = {}
-    _build_flat_index(ui_tree, flat_index)
+    # Build the tree starting from root, with a flat node list and parent
+    # links for quick lookup
+    flat_nodes = []
+    parents = []
+    ui_tree = _build_tree_node(root, element_id=[0], flat_nodes=flat_nodes, parents=parents)
+    flat_index = {node["id"]: node for node in flat_nodes}
     
     # Analyze the tree for patterns
-    analysis = _analyze_tree(ui_tree, flat_index)
+    analysis = _analyze_tree(flat_nodes, parents)
     
     return {
         "tree": ui_tree,
@@ -32,16 +37,80 @@ def parse_true_tree(xml_path: str) -> Dict[str, Any]:
     }
 
 
-def _build_tree_node(node, element_id: List[int], parent_path: str = "") -> Optional[Dict]:
-    """Recursively build tree node with all children"""
+def _build_tree_node(root, element_id: List[int], parent_path: str = "",
+                     flat_nodes: Optional[List[Dict]] = None,
+                     parents: Optional[List[int]] = None) -> Optional[Dict]:
+    """
+    Build tree node with all children.
+    Iterative DFS assigning ids in pre-order. A container that would only
+    wrap one visible child is skipped before it gets an id, and the child
+    takes its place.
+    If given, flat_nodes collects the nodes in pre-order and parents the
+    list position of each node's parent (-1 for the root).
+    """
+    fields = _node_fields(root)
+    if fields is None:
+        return None
+    
+    if flat_nodes is None:
+        flat_nodes = []
+    if parents is None:
+        parents = []
+    
+    result = []
+    # Frames: (xml_node, its fields, parent_path, siblings, parent position, flattened)
+    stack = [(root, fields, parent_path, result, -1, False)]
+    
+    while stack:
+        node, fields, path, siblings, parent_pos, flattened = stack.pop()
+        
+        # Children that will appear in the tree (empty containers are skipped)
+        children = []
+        for child in node:
+            child_fields = _node_fields(child)
+            if child_fields is not None:
+                children.append((child, child_fields))
+        
+        # If this is a container with only one visible child, use the child
+        # directly to flatten unnecessary nesting
+        if fields[-1] and len(children) == 1:
+            child, child_fields = children[0]
+            stack.append((child, child_fields, path, siblings, parent_pos, True))
+            continue
+        
+        current_node = _make_tree_node(fields, element_id[0], path)
+        if flattened:
+            current_node["parent_was_container"] = True
+        siblings.append(current_node)
+        pos = len(flat_nodes)
+        flat_nodes.append(current_node)
+        parents.append(parent_pos)
+        
+        # Increment ID for next element
+        element_id[0] += 1
+        
+        # Process all children, in document order
+        for child, child_fields in reversed(children):
+            stack.append((child, child_fields, current_node["path"], current_node["children"], pos, False))
+    
+    return result[0]
+
+
+def _node_fields(node) -> Optional[Tuple]:
+    """
+    Read the fields of one XML node.
+    Returns None for empty containers, which are skipped. The last field
+    says whether the node may be flattened into a single child.
+    """
     # Get node attributes
-    text = node.get("text", "").strip()
-    desc = node.get("content-desc", "").strip()
-    res_id = node.get("resource-id", "")
-    clickable = node.get("clickable", "false") == "true"
-    enabled = node.get("enabled", "false") == "true"
-    class_name = node.get("class", "")
-    bounds = node.get("bounds", "")
+    get = node.get
+    text = get("text", "").strip()
+    desc = get("content-desc", "").strip()
+    res_id = get("resource-id", "")
+    clickable = get("clickable", "false") == "true"
+    enabled = get("enabled", "false") == "true"
+    class_name = get("class", "")
+    bounds = get("bounds", "")
     
     # Determine visibility
     visible_text = text or desc
@@ -61,16 +130,24 @@ def _build_tree_node(node, element_id: List[int], parent_path: str = "") -> Opti
         # Skip empty containers
         return None
     
+    collapsible = is_container and not visible_text and not clickable
+    return elem_type, visible_text, text, desc, clickable, enabled, bounds, collapsible
+
+
+def _make_tree_node(fields: Tuple, node_id: int, parent_path: str) -> Dict:
+    """Build one tree node, without children, from its fields"""
+    elem_type, visible_text, text, desc, clickable, enabled, bounds, _ = fields
+    
     # Build current node
     current_node = {
-        "id": element_id[0],
+        "id": node_id,
         "type": elem_type,
         "text": visible_text or f"[{elem_type}]",
         "original_text": text,
         "content_desc": desc,
         "clickable": clickable,
         "enabled": enabled,
-        "path": parent_path + f"/{elem_type}[{element_id[0]}]",
+        "path": parent_path + f"/{elem_type}[{node_id}]",
         "children": []
     }
     
@@ -85,29 +162,15 @@ def _build_tree_node(node, element_id: List[int], parent_path: str = "") -> Opti
     if bounds and bounds != "[0,0][0,0]":
         current_node["bounds"] = bounds
     
-    # Increment ID for next element
-    element_id[0] += 1
-    
-    # Process all children
-    for child in node:
-        child_node = _build_tree_node(child, element_id, current_node["path"])
-        if child_node:
-            current_node["children"].append(child_node)
-    
-    # If this is a container with only one visible child, merge them
-    if (is_container and not visible_text and 
-        len(current_node["children"]) == 1 and 
-        not current_node["clickable"]):
-        # Return the child directly to flatten unnecessary nesting
-        child = current_node["children"][0]
-        child["parent_was_container"] = True
-        return child
-    
     return current_node
 
 
+@lru_cache(maxsize=512)
 def _get_type(class_name: str, clickable: bool) -> str:
-    """Determine element type"""
+    """
+    Determine element type.
+    Cached: a dump repeats the same few class/clickable combinations.
+    """
     class_lower = class_name.lower()
     
     if "edittext" in class_lower:
@@ -136,15 +199,7 @@ def _get_type(class_name: str, clickable: bool) -> str:
         return "element"
 
 
-def _build_flat_index(node: Dict, index: Dict):
-    """Build flat index of all nodes for quick lookup"""
-    if node:
-        index[node["id"]] = node
-        for child in node.get("children", []):
-            _build_flat_index(child, index)
-
-
-def _analyze_tree(tree: Dict, flat_index: Dict) -> Dict[str, Any]:
+def _analyze_tree(flat_nodes: List[Dict], parents: List[int]) -> Dict[str, Any]:
     """Analyze the tree to find patterns and relationships"""
     analysis = {
         "forms": [],
@@ -153,43 +208,53 @@ def _analyze_tree(tree: Dict, flat_index: Dict) -> Dict[str, Any]:
         "relationships": []
     }
     
-    # Find all elements by type
-    for elem_id, elem in flat_index.items():
-        if elem.get("action") == "type":
-            # Input field - look for associated label
-            label = _find_label_for_input(elem, tree)
-            form_group = _find_form_container(elem, tree)
-            
-            analysis["forms"].append({
-                "input_id": elem_id,
-                "input_text": elem["text"],
-                "label": label,
-                "form_group": form_group
-            })
-        
-        if elem.get("clickable"):
-            analysis["clickable_elements"].append({
-                "id": elem_id,
-                "text": elem["text"],
-                "type": elem["type"],
-                "action": elem.get("action", "tap")
-            })
-        
-        if elem["type"] == "text" and not elem.get("clickable"):
+    # Hot fields as columns, so each filter below is one scan over a list
+    actions = [elem.get("action") for elem in flat_nodes]
+    clickable = bytearray(bool(elem.get("clickable")) for elem in flat_nodes)
+    types = [elem["type"] for elem in flat_nodes]
+    
+    # Inputs below each node, for form container detection
+    input_counts = _count_descendant_inputs(actions, parents)
+    form_containers = _nearest_form_containers(input_counts, parents)
+    
+    # Input fields - look for associated labels
+    for pos in [i for i, action in enumerate(actions) if action == "type"]:
+        elem = flat_nodes[pos]
+        analysis["forms"].append({
+            "input_id": elem["id"],
+            "input_text": elem["text"],
+            "label": _find_label_for_input(pos, flat_nodes, parents),
+            "form_group": _find_form_container(pos, flat_nodes, parents, form_containers)
+        })
+    
+    clickable_positions = [i for i, flag in enumerate(clickable) if flag]
+    for pos in clickable_positions:
+        elem = flat_nodes[pos]
+        analysis["clickable_elements"].append({
+            "id": elem["id"],
+            "text": elem["text"],
+            "type": elem["type"],
+            "action": elem.get("action", "tap")
+        })
+    
+    for pos, elem_type in enumerate(types):
+        if elem_type == "text" and not clickable[pos]:
+            elem = flat_nodes[pos]
             analysis["text_elements"].append({
-                "id": elem_id,
+                "id": elem["id"],
                 "text": elem["text"]
             })
     
     # Find parent-child relationships for clickables
-    for elem_id, elem in flat_index.items():
-        if elem.get("clickable") and elem.get("children"):
+    for pos in clickable_positions:
+        elem = flat_nodes[pos]
+        if elem.get("children"):
             # This clickable has children
             child_texts = []
             _collect_child_texts(elem, child_texts)
             if child_texts:
                 analysis["relationships"].append({
-                    "parent_id": elem_id,
+                    "parent_id": elem["id"],
                     "parent_text": elem["text"],
                     "contains_texts": child_texts,
                     "relationship": "contains"
@@ -198,10 +263,13 @@ def _analyze_tree(tree: Dict, flat_index: Dict) -> Dict[str, Any]:
     return analysis
 
 
-def _find_label_for_input(input_elem: Dict, tree: Dict) -> Optional[str]:
+def _find_label_for_input(input_pos: int, flat_nodes: List[Dict],
+                          parents: List[int]) -> Optional[str]:
     """Find text label for an input field by checking siblings and parent"""
+    input_elem = flat_nodes[input_pos]
+    
     # Strategy 1: Check immediate siblings in parent
-    parent = _find_parent_of(input_elem["id"], tree)
+    parent = _find_parent_of(input_pos, flat_nodes, parents)
     if parent:
         for i, child in enumerate(parent["children"]):
             if child["id"] == input_elem["id"] and i > 0:
@@ -223,40 +291,47 @@ def _find_label_for_input(input_elem: Dict, tree: Dict) -> Optional[str]:
     return None
 
 
-def _find_form_container(elem: Dict, tree: Dict) -> Optional[str]:
-    """Find the form container this element belongs to"""
-    parent = _find_parent_of(elem["id"], tree)
-    while parent:
-        # Check if parent has multiple inputs (likely a form)
-        input_count = sum(1 for child in _get_all_descendants(parent) 
-                         if child.get("action") == "type")
-        if input_count >= 2:
-            return parent["text"] if parent["text"] != f"[{parent['type']}]" else "Form"
-        parent = _find_parent_of(parent["id"], tree)
-    return None
+def _find_form_container(pos: int, flat_nodes: List[Dict], parents: List[int],
+                         form_containers: List[int]) -> Optional[str]:
+    """Find the form container this element belongs to, from its parent's nearest one"""
+    parent_pos = parents[pos]
+    if parent_pos < 0 or form_containers[parent_pos] < 0:
+        return None
+    parent = flat_nodes[form_containers[parent_pos]]
+    return parent["text"] if parent["text"] != f"[{parent['type']}]" else "Form"
 
 
-def _find_parent_of(elem_id: int, tree: Dict) -> Optional[Dict]:
-    """Find parent node of given element ID"""
-    def search(node: Dict) -> Optional[Dict]:
-        for child in node.get("children", []):
-            if child["id"] == elem_id:
-                return node
-            result = search(child)
-            if result:
-                return result
-        return None
-    
-    return search(tree)
+def _nearest_form_containers(input_counts: List[int], parents: List[int]) -> List[int]:
+    """
+    Position of the closest node at or above every node that holds at least
+    two inputs (likely a form), or -1. Parents come before their children
+    in pre-order, so one forward pass sees each parent's answer first.
+    """
+    nearest = [-1] * len(parents)
+    for pos, parent_pos in enumerate(parents):
+        if input_counts[pos] >= 2:
+            nearest[pos] = pos
+        elif parent_pos >= 0:
+            nearest[pos] = nearest[parent_pos]
+    return nearest
+
+
+def _count_descendant_inputs(actions: List[Optional[str]], parents: List[int]) -> List[int]:
+    """
+    Number of input descendants of every node, by list position, in one pass.
+    Nodes are in pre-order, so walking them backwards sees every node
+    before its parent and each count is final when it is pushed up.
+    """
+    counts = [0] * len(actions)
+    for pos in range(len(actions) - 1, 0, -1):
+        counts[parents[pos]] += counts[pos] + (actions[pos] == "type")
+    return counts
 
 
-def _get_all_descendants(node: Dict) -> List[Dict]:
-    """Get all descendants of a node"""
-    descendants = []
-    for child in node.get("children", []):
-        descendants.append(child)
-        descendants.extend(_get_all_descendants(child))
-    return descendants
+def _find_parent_of(pos: int, flat_nodes: List[Dict], parents: List[int]) -> Optional[Dict]:
+    """Find parent node of the node at the given list position"""
+    parent_pos = parents[pos]
+    return flat_nodes[parent_pos] if parent_pos >= 0 else None
 
 
 def _collect_child_texts(node: Dict, texts: List[str], max_depth: int = 3, current_depth: int = 0):
@@ -264,7 +339,11 @@ def _collect_child_texts(node: Dict, texts: List[str], max_depth: int = 3, curre
     if current_depth >= max_depth:
         return
     
-    for child in node.get("children", []):
-        if child["type"] == "text" and child["text"] != f"[{child['type']}]":
+    # (descendant, depth of its parent's level), popped in pre-order
+    stack = [(child, current_depth) for child in reversed(node.get("children", []))]
+    while stack:
+        child, depth = stack.pop()
+        if child["type"] == "text" and child["text"] != _TEXT_PLACEHOLDER:
             texts.append(child["text"])
-        _collect_child_texts(child, texts, max_depth, current_depth + 1)
\ No newline at end of file
+        if depth + 1 < max_depth:
+            stack.extend((grandchild, depth + 1) for grandchild in reversed(child.get("children", [])))
@@ -1,9 +1,9 @@
 """
 Ultra-simple parser that just works - focused on getting actionable elements
 """
-from lxml import etree
 from typing import Dict, List, Any
 import re
+from .parser import iter_nodes
 
 
 def parse_actionable_elements(xml_path: str) -> Dict[str, Any]:
@@ -11,25 +11,25 @@ def parse_actionable_elements(xml_path: str) -> Dict[str, Any]:
     Dead simple parser that extracts only what matters for UI automation.
     No fancy hierarchies, just actionable elements with clear labels.
     """
-    tree = etree.parse(xml_path)
-    root = tree.getroot()
-    
     elements = []
+    inputs = []
+    buttons = []
     idx = 0
     
-    # Just get all nodes
-    for node in root.xpath("//node"):
+    # Just stream all nodes
+    for node in iter_nodes(xml_path):
+        get = node.get
         # Basic filters
-        if node.get("enabled", "false") != "true":
+        if get("enabled", "false") != "true":
             continue
             
         # Get the basics
-        text = node.get("text", "").strip()
-        desc = node.get("content-desc", "").strip()
-        res_id = node.get("resource-id", "")
-        clickable = node.get("clickable", "false") == "true"
-        class_name = node.get("class", "")
-        bounds = node.get("bounds", "")
+        text = get("text", "").strip()
+        desc = get("content-desc", "").strip()
+        res_id = get("resource-id", "")
+        clickable = get("clickable", "false") == "true"
+        class_name = get("class", "")
+        bounds = get("bounds", "")
         
         # Must have SOME label
         label = text or desc
@@ -41,8 +41,9 @@ def parse_actionable_elements(xml_path: str) -> Dict[str, Any]:
             continue
             
         # Determine if it's interactive
-        is_input = "edittext" in class_name.lower()
-        is_button = "button" in class_name.lower()
+        class_lower = class_name.lower()
+        is_input = "edittext" in class_lower
+        is_button = "button" in class_lower
         is_interactive = clickable or is_input or is_button
         
         if not is_interactive:
@@ -81,12 +82,16 @@ def parse_actionable_elements(xml_path: str) -> Dict[str, Any]:
             element["hint"] = "cancel_button"
             
         elements.append(element)
+        # Group by action type as we go
+        if action == "type":
+            inputs.append(element)
+        elif action == "tap":
+            buttons.append(element)
         idx += 1
     
-    # Group by action type
     grouped = {
-        "inputs": [e for e in elements if e["action"] == "type"],
-        "buttons": [e for e in elements if e["action"] == "tap"],
+        "inputs": inputs,
+        "buttons": buttons,
         "all": elements
     }
     
@@ -0,0 +1,75 @@
+from src.fast_tree_parser import parse_fast_tree, get_family_tree
+
+
+LOGIN_SCREEN = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node class="android.widget.FrameLayout" enabled="true" clickable="false">
+    <node class="android.widget.LinearLayout" enabled="true" clickable="false">
+      <node class="android.widget.TextView" text="Sign in" enabled="true" clickable="false"/>
+      <node class="android.widget.TextView" text="Email" enabled="true" clickable="false"/>
+      <node class="android.widget.EditText" resource-id="com.app:id/email" enabled="true" clickable="true"/>
+      <node class="android.widget.TextView" text="Password" enabled="true" clickable="false"/>
+      <node class="android.widget.EditText" resource-id="com.app:id/password" enabled="true" clickable="true"/>
+      <node class="android.view.View" enabled="true" clickable="false"/>
+      <node class="android.widget.Button" text="Login" enabled="true" clickable="true"/>
+    </node>
+    <node class="android.widget.LinearLayout" text="Settings" enabled="true" clickable="true">
+      <node class="android.widget.LinearLayout" enabled="true" clickable="false">
+        <node class="android.widget.TextView" text="Manage account" enabled="true" clickable="false"/>
+      </node>
+      <node class="android.widget.TextView" text="Email" enabled="true" clickable="false"/>
+    </node>
+    <node class="android.widget.TextView" text="Search" enabled="true" clickable="false"/>
+    <node class="android.widget.EditText" resource-id="com.app:id/search" enabled="true" clickable="true">
+      <node class="android.widget.TextView" text="Search hint" enabled="true" clickable="false"/>
+    </node>
+    <node class="android.widget.Button" text="Help" enabled="false" clickable="true"/>
+  </node>
+</hierarchy>"""
+
+
+def _ids(node):
+    """Ids of a tree node and all its descendants, in document order"""
+    ids = [node["id"]]
+    for child in node.get("children", []):
+        ids.extend(_ids(child))
+    return ids
+
+
+def test_parse_fast_tree_ids_and_pruning(tmp_path):
+    """Test ids, early rejects, collapsed wrappers and de-duplication"""
+    dump = tmp_path / "window_dump.xml"
+    dump.write_text(LOGIN_SCREEN)
+    
+    result = parse_fast_tree(str(dump))
+    frame = result["screen"]["children"][0]
+    
+    # Empty leaf (8), wrapper with one child (11) and the duplicate "Email" (13)
+    # consume ids but are not in the tree; the disabled button consumes none
+    assert result["total_elements"] == 17
+    assert _ids(result["screen"]) == [0, 1, 2, 3, 4, 5, 6, 7, 9, 10, 12, 14, 15, 16]
+    
+    settings = frame["children"][1]
+    assert settings["text"] == "Settings"
+    assert settings["children"] == [{"id": 12, "type": "text", "text": "Manage account"}]
+    assert frame["children"][3]["children"] == [{"id": 16, "type": "text", "text": "Search hint"}]
+
+
+def test_get_family_tree_relationships(tmp_path):
+    """Test label/input pairs, contains links and hierarchy-only links in order"""
+    dump = tmp_path / "window_dump.xml"
+    dump.write_text(LOGIN_SCREEN)
+    
+    family = get_family_tree(parse_fast_tree(str(dump))["screen"])
+    
+    assert family["relationships"] == [
+        {"parent": "Screen", "child": "Sign in", "relationship": "contains"},
+        {"label": "Email", "input": "com.app:id/email", "relationship": "label_for_input"},
+        {"label": "Password", "input": "com.app:id/password", "relationship": "label_for_input"},
+        {"parent": "Screen", "child": "Login", "relationship": "contains"},
+        {"parent": "Screen", "child": "Settings", "relationship": "contains"},
+        {"parent": "Settings", "child": "Manage account", "relationship": "contains"},
+        {"label": "Search", "input": "com.app:id/search", "relationship": "label_for_input"},
+        # Only reachable through the hierarchy: it sits inside a paired input
+        {"parent": "Screen", "child": "Search hint", "relationship": "contains"},
+    ]
@@ -0,0 +1,70 @@
+from src.list_detector import detect_and_group_list_items, _bounds_to_soa, _identify_list_items
+
+
+def _text(label, bounds):
+    return {"type": "text", "label": label, "bounds": bounds, "in_list": True}
+
+
+def _tap(label, bounds):
+    return {"type": "container", "action": "tap", "label": label, "bounds": bounds, "in_list": True}
+
+
+def test_bounds_to_soa_parses_centers():
+    """Test that bounds are parsed once into x/y center columns"""
+    x_centers, y_centers = _bounds_to_soa([
+        {"bounds": "[0,0][100,50]"},
+        {"bounds": "bad"},
+        {},
+    ])
+    
+    assert list(x_centers) == [50, 0, 0]
+    assert list(y_centers) == [25, 0, 0]
+
+
+def test_horizontal_list_is_sorted_by_x():
+    """Test that a list spread wider than tall is ordered and split along x"""
+    elements = [
+        _text("Third", "[900,0][1000,50]"),
+        _text("First", "[0,0][100,50]"),
+        _text("Second", "[450,0][550,50]"),
+    ]
+    
+    items = _identify_list_items(elements)
+    
+    assert [item["title"] for item in items] == ["First", "Second", "Third"]
+
+
+def test_vertical_list_groups_by_pattern_and_skips_badges():
+    """Test pattern grouping: badge labels never become the item title"""
+    elements = []
+    for i, (title, badge) in enumerate([("Teen Patti", "NEW! rummy"),
+                                        ("Rummy Gold", "HOT! poker"),
+                                        ("Daily bonus", "5% cashback")]):
+        top = i * 300
+        elements += [
+            _text(badge, f"[0,{top}][200,{top + 40}]"),
+            _text(title, f"[0,{top + 50}][200,{top + 90}]"),
+            _tap("Play", f"[0,{top + 100}][1080,{top + 200}]"),
+        ]
+    non_list = {"type": "text", "label": "Games", "bounds": "[0,0][1080,100]"}
+    
+    groups = detect_and_group_list_items([non_list] + elements[::-1])
+    
+    assert groups[0] == {"elements": [non_list], "type": "non_list_group"}
+    assert [g["title"] for g in groups[1:]] == ["Teen Patti", "Rummy Gold", "Item"]
+    assert all(len(g["elements"]) == 3 for g in groups[1:])
+
+
+def test_vertical_list_falls_back_to_proximity():
+    """Test proximity grouping when element types do not repeat"""
+    elements = [
+        _text("Wallet", "[0,0][200,40]"),
+        {"type": "image", "label": "", "bounds": "[0,60][100,160]", "in_list": True},
+        _text("Balance and history", "[0,120][600,160]"),
+        _text("Refer", "[0,500][200,540]"),
+    ]
+    
+    items = _identify_list_items(elements)
+    
+    assert [item["title"] for item in items] == ["Balance and history", "Refer"]
+    assert [len(item["elements"]) for item in items] == [3, 1]
@@ -0,0 +1,91 @@
+import json
+import threading
+
+import pytest
+from src import llm_common
+from src.llm_common import LLMClientBase, cache_key
+
+
+class FakeClient(LLMClientBase):
+    """LLM client whose planning backend returns a canned response"""
+    
+    def __init__(self, response: str):
+        super().__init__()
+        self.response = response
+        self.prompts = []
+    
+    def _generate_steps(self, prompt, max_steps):
+        self.prompts.append(prompt)
+        return self.response
+
+
+def test_plan_steps_validates_and_caps_steps():
+    """Test that shared planning parses, validates and truncates the plan"""
+    step = {"action": "click", "element_index": 0, "reason": "r", "confidence": 0.9}
+    client = FakeClient(json.dumps({"steps": [step] * 3}))
+    screen_dump = {"screen_elements": [{"label": "OK"}]}
+    
+    assert client.plan_steps(screen_dump, "tap ok", max_steps=2) == [step, step]
+    assert "Current user goal: tap ok" in client.prompts[0]
+    
+    with pytest.raises(ValueError):
+        FakeClient(json.dumps({"steps": [{"action": "click"}]})).plan_steps(screen_dump, "tap ok")
+    with pytest.raises(ValueError):
+        FakeClient("not json").plan_steps(screen_dump, "tap ok")
+    for index in ("0", 0.0, None):
+        bad_step = dict(step, element_index=index)
+        with pytest.raises(ValueError):
+            FakeClient(json.dumps({"steps": [bad_step]})).plan_steps(screen_dump, "tap ok")
+
+
+def test_client_without_backend_cannot_be_created():
+    """Test that subclasses must implement _generate_steps"""
+    class NoBackend(LLMClientBase):
+        pass
+    
+    with pytest.raises(TypeError):
+        NoBackend()
+
+
+def test_analysis_cache_evicts_least_recently_used(monkeypatch):
+    """Test that the shared cache hands out copies and evicts in LRU order"""
+    monkeypatch.setattr(llm_common, "CACHE_SIZE", 2)
+    client = FakeClient("")
+    first, second, third = (cache_key("[]", goal) for goal in ("a", "b", "c"))
+    
+    client._remember(first, {"element_index": 1})
+    client._remember(second, {"element_index": 2})
+    client._cached(first)["element_index"] = 99  # Copies do not leak into the cache
+    client._remember(third, {"element_index": 3})
+    
+    assert client._cached(first) == {"element_index": 1}
+    assert client._cached(second) is None
+    
+    client.clear_cache()
+    assert client._cached(third) is None
+
+
+def test_analysis_cache_is_thread_safe(monkeypatch):
+    """Test that concurrent lookups and stores keep the LRU bound"""
+    monkeypatch.setattr(llm_common, "CACHE_SIZE", 8)
+    client = FakeClient("")
+    keys = [cache_key("[]", str(i)) for i in range(32)]
+    errors = []
+    
+    def worker(offset):
+        try:
+            for i in range(2000):
+                key = keys[(i + offset) % len(keys)]
+                if client._cached(key) is None:
+                    client._remember(key, {"element_index": i})
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(client._cache) <= 8
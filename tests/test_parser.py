@@ -1,7 +1,7 @@
+import io
 import pytest
-from pathlib import Path
-import tempfile
-from src.parser import parse
+from src import parser
+from src.parser import parse_bytes, parse_hierarchical_for_llm, to_json
 
 
 def test_parse_basic():
@@ -25,31 +25,23 @@ def test_parse_basic():
         bounds="[100,500][400,600]"/>
 </hierarchy>"""
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as f:
-        f.write(xml_content)
-        temp_path = f.name
+    nodes = parse_bytes(xml_content.encode())
     
-    try:
-        nodes = parse(temp_path)
-        
-        assert len(nodes) == 3
-        
-        # Check first node
-        assert nodes[0]["resource-id"] == "com.example:id/button1"
-        assert nodes[0]["text"] == "Login"
-        assert nodes[0]["content-desc"] == ""
-        assert nodes[0]["clickable"] is True
-        assert nodes[0]["bounds"] == "[100,200][300,400]"
-        
-        # Check second node
-        assert nodes[1]["clickable"] is False
-        
-        # Check third node
-        assert nodes[2]["content-desc"] == "Username field"
-        assert nodes[2]["clickable"] is True
-        
-    finally:
-        Path(temp_path).unlink()
+    assert len(nodes) == 3
+    
+    # Check first node
+    assert nodes[0]["resource-id"] == "com.example:id/button1"
+    assert nodes[0]["text"] == "Login"
+    assert nodes[0]["content-desc"] == ""
+    assert nodes[0]["clickable"] is True
+    assert nodes[0]["bounds"] == "[100,200][300,400]"
+    
+    # Check second node
+    assert nodes[1]["clickable"] is False
+    
+    # Check third node
+    assert nodes[2]["content-desc"] == "Username field"
+    assert nodes[2]["clickable"] is True
 
 
 def test_parse_empty_nodes():
@@ -60,14 +52,85 @@ def test_parse_empty_nodes():
   <node resource-id="com.example:id/valid" text="" content-desc="" clickable="true" bounds="[0,0][100,100]"/>
 </hierarchy>"""
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as f:
-        f.write(xml_content)
-        temp_path = f.name
+    nodes = parse_bytes(xml_content.encode())
+    # Only the second node should be included
+    assert len(nodes) == 1
+    assert nodes[0]["resource-id"] == "com.example:id/valid"
+
+def test_parse_returns_plain_dicts():
+    """Test that parsed nodes are plain, mutable, JSON-ready dicts"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node resource-id="com.example:id/ok" text="OK" content-desc="" clickable="true" bounds="[0,0][100,100]"/>
+</hierarchy>"""
+    
+    nodes = parse_bytes(xml_content.encode())
+    
+    assert type(nodes) is list
+    assert nodes[0] == {
+        "resource-id": "com.example:id/ok",
+        "text": "OK",
+        "content-desc": "",
+        "clickable": True,
+        "bounds": "[0,0][100,100]"
+    }
+    nodes[0]["label"] = "OK button"
+    assert nodes[0]["label"] == "OK button"
+
+
+def test_to_json_is_compact():
+    """Test that to_json serializes parsed nodes compactly"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node resource-id="" text="Café" content-desc="" clickable="true" bounds="[0,0][10,10]"/>
+</hierarchy>"""
+    
+    assert to_json(parse_bytes(xml_content.encode())) == (
+        '[{"resource-id":"","text":"Café","content-desc":"",'
+        '"clickable":true,"bounds":"[0,0][10,10]"}]'
+    )
+
+
+def test_hierarchical_visits_nested_containers_once():
+    """Test that elements inside nested containers are reported exactly once"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node class="android.widget.FrameLayout" resource-id="" text="" clickable="false" enabled="true" bounds="[0,0][1080,2400]">
+    <node class="android.widget.LinearLayout" resource-id="com.example:id/login_form" text="" clickable="false" enabled="true" bounds="[0,0][1080,1200]">
+      <node class="android.widget.LinearLayout" resource-id="" text="" clickable="false" enabled="true" bounds="[0,0][1080,600]">
+        <node class="android.widget.EditText" resource-id="com.example:id/user" text="" clickable="true" enabled="true" bounds="[0,0][1080,200]"/>
+      </node>
+      <node class="android.widget.Button" resource-id="com.example:id/login" text="Login" clickable="true" enabled="true" bounds="[0,600][1080,800]"/>
+    </node>
+  </node>
+</hierarchy>"""
+    
+    result = parse_hierarchical_for_llm(io.BytesIO(xml_content.encode()))
+    
+    assert result["count"] == 2
+    assert sorted(e["idx"] for e in result["elements"]) == [0, 1]
+    assert sorted(e["label"] for e in result["elements"]) == ["Login", "user input"]
+    
+    # The inner layout is surfaced as its own section next to the form
+    assert sorted(s["type"] for s in result["screen"]["sections"]) == ["form", "section"]
+    assert all("section_buckets" not in s for s in result["screen"]["sections"])
+
+
+def test_stdlib_node_stream_matches_lxml(monkeypatch):
+    """Test that the PyPy ElementTree stream parses like the lxml one"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node resource-id="com.example:id/list" text="" content-desc="" clickable="false" bounds="[0,0][1080,2000]">
+    <node resource-id="com.example:id/row" text="Row" content-desc="" clickable="true" bounds="[0,0][1080,200]">
+      <node resource-id="" text="Nested" content-desc="desc" clickable="false" bounds="[0,0][500,100]"/>
+    </node>
+    <node resource-id="" text="Café" content-desc="" clickable="true" bounds="[0,200][1080,400]"/>
+  </node>
+</hierarchy>"""
+    
+    data = xml_content.encode()
+    expected = parse_bytes(data)
+    monkeypatch.setattr(parser, "iter_nodes", parser._iter_nodes_stdlib)
     
-    try:
-        nodes = parse(temp_path)
-        # Only the second node should be included
-        assert len(nodes) == 1
-        assert nodes[0]["resource-id"] == "com.example:id/valid"
-    finally:
-        Path(temp_path).unlink()
\ No newline at end of file
+    assert parse_bytes(data) == expected
+    assert len(expected) == 4
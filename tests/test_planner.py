@@ -1,5 +1,14 @@
+import asyncio
+import os
+import tempfile
+import threading
+from pathlib import Path
+
 import pytest
-from src.planner import choose_node
+from src.planner import (
+    choose_node, _parse_cached, _analyze_with_cache, plan_sequence,
+    analyze_screen_for_goal_async, _local_shortcut,
+)
 
 
 def test_choose_node_with_text():
@@ -43,4 +52,171 @@ def test_choose_node_no_clickable():
 def test_choose_node_empty_list():
     """Test returns None for empty node list"""
     chosen = choose_node([])
-    assert chosen is None
\ No newline at end of file
+    assert chosen is None
+
+
+def test_parse_cached_reuses_until_file_changes():
+    """Test that the planner parse cache is keyed on the dump's mtime and size"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node resource-id="" text="{}" content-desc="" clickable="true" class="android.widget.Button" bounds="[0,0][100,100]"/>
+</hierarchy>"""
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as f:
+        f.write(xml_content.format("First"))
+        temp_path = f.name
+    
+    try:
+        stat = os.stat(temp_path)
+        first = _parse_cached(temp_path, stat.st_mtime_ns, stat.st_size)
+        assert _parse_cached(temp_path, stat.st_mtime_ns, stat.st_size) is first
+        
+        Path(temp_path).write_text(xml_content.format("Second"))
+        os.utime(temp_path, ns=(stat.st_mtime_ns + 1, stat.st_mtime_ns + 1))
+        second = _parse_cached(temp_path, stat.st_mtime_ns + 1, os.stat(temp_path).st_size)
+        assert second[0]["label"] == "Second"
+        
+        # Rewritten within the same timestamp tick: the size still differs
+        Path(temp_path).write_text(xml_content.format("Third one"))
+        os.utime(temp_path, ns=(stat.st_mtime_ns + 1, stat.st_mtime_ns + 1))
+        third = _parse_cached(temp_path, stat.st_mtime_ns + 1, os.stat(temp_path).st_size)
+        assert third[0]["label"] == "Third one"
+    finally:
+        Path(temp_path).unlink()
+
+
+def test_analyze_with_cache_reuses_disk_result(monkeypatch, tmp_path):
+    """Test that TESTME_LLM_CACHE=1 skips the LLM for a repeated screen and goal"""
+    monkeypatch.setenv("TESTME_LLM_CACHE", "1")
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    
+    class FakeLLM:
+        calls = 0
+        
+        def analyze_screen(self, screen_dump, user_goal):
+            self.calls += 1
+            return {"action": "click", "element_index": 0, "reason": "r", "confidence": 0.9}
+    
+    llm = FakeLLM()
+    screen_dump = {"screen_elements": [{"label": "OK"}], "element_types": {"button": 1}}
+    
+    first = _analyze_with_cache(llm, screen_dump, "tap ok")
+    second = _analyze_with_cache(llm, screen_dump, "tap ok")
+    
+    assert first == second
+    assert llm.calls == 1
+    
+    _analyze_with_cache(llm, screen_dump, "go back")
+    assert llm.calls == 2
+    
+    # Incomplete entries are misses and get rewritten; no temp files are left
+    cache_dir = tmp_path / ".cache" / "testme" / "llm"
+    for bad in ("[1, 2]", '{"action": "click"}'):
+        for entry in cache_dir.glob("*.json"):
+            entry.write_text(bad)
+        assert _analyze_with_cache(llm, screen_dump, "tap ok") == first
+    assert llm.calls == 4
+    assert not list(cache_dir.glob("*.tmp"))
+
+
+def test_plan_sequence_uses_one_request(monkeypatch, tmp_path):
+    """Test that a multi-step plan is fetched once and mapped to screen elements"""
+    import src.llm_client_simple as llm_client_simple
+    
+    (tmp_path / "window_dump.xml").write_text("""<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node resource-id="com.app:id/user" text="" content-desc="" clickable="true" enabled="true" class="android.widget.EditText" bounds="[0,0][500,100]"/>
+  <node resource-id="com.app:id/login" text="Login" content-desc="" clickable="true" enabled="true" class="android.widget.Button" bounds="[0,200][500,300]"/>
+</hierarchy>""")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GOOGLE_AI_API_KEY", "test")
+    
+    class FakeLLM:
+        calls = 0
+        
+        def plan_steps(self, screen_dump, user_goal, max_steps):
+            self.calls += 1
+            return [
+                {"action": "type", "element_index": 0, "reason": "r", "confidence": 0.9, "text_input": "me"},
+                {"action": "click", "element_index": 1, "reason": "r", "confidence": 0.8},
+                {"action": "click", "element_index": 7, "reason": "r", "confidence": 0.5},
+            ]
+    
+    llm = FakeLLM()
+    monkeypatch.setattr(llm_client_simple, "get_simple_llm_client", lambda: llm)
+    
+    steps = plan_sequence("log in as me")
+    
+    assert llm.calls == 1
+    assert [s["action"] for s in steps] == ["type", "click"]
+    assert steps[1]["element"]["label"] == "Login"
+    
+    # Returned elements are copies, so callers cannot corrupt the parse cache
+    steps[1]["element"]["label"] = "Changed"
+    steps[1]["element"]["identifiers"]["text"] = "Changed"
+    again = plan_sequence("log in as me")
+    assert again[1]["element"]["label"] == "Login"
+    assert again[1]["element"]["identifiers"]["text"] == "Login"
+
+
+def test_analyze_async_reads_dump_before_awaiting(monkeypatch, tmp_path):
+    """Test that a concurrent re-dump does not change the screen being analyzed"""
+    import src.llm_client_simple as llm_client_simple
+    
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node resource-id="" text="{}" content-desc="" clickable="true" enabled="true" class="android.widget.Button" bounds="[0,0][500,100]"/>
+</hierarchy>"""
+    dump = tmp_path / "window_dump.xml"
+    dump.write_text(xml_content.format("Current"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GOOGLE_AI_API_KEY", "test")
+    monkeypatch.delenv("TESTME_LLM_CACHE", raising=False)
+    
+    class FakeLLM:
+        def analyze_screen(self, screen_dump, user_goal):
+            return {"action": "click", "element_index": 0, "reason": "r", "confidence": 0.9,
+                    "label": screen_dump["screen_elements"][0]["label"]}
+    
+    client_threads = []
+    
+    def get_client():
+        client_threads.append(threading.current_thread())
+        return FakeLLM()
+    
+    monkeypatch.setattr(llm_client_simple, "get_simple_llm_client", get_client)
+    
+    async def dump_next_screen():
+        dump.write_text(xml_content.format("Next"))
+    
+    async def run():
+        return await asyncio.gather(analyze_screen_for_goal_async("tap"), dump_next_screen())
+    
+    result, _ = asyncio.run(run())
+    
+    assert result["label"] == "Current"
+    assert result["element"]["label"] == "Current"
+    # Client setup happens in the worker thread, not on the event loop
+    assert client_threads and client_threads[0] is not threading.main_thread()
+
+
+def test_local_shortcut_only_for_unambiguous_match():
+    """Test that the LLM is skipped only when one clickable clearly matches the goal"""
+    nodes = [
+        {"label": "Sign in with Google", "clickable": True, "type": "button"},
+        {"label": "Sign in with Email", "clickable": True, "type": "button"},
+        {"label": "Google Pay", "clickable": False, "type": "button"},
+    ]
+    
+    decision = _local_shortcut(nodes, "Sign in with Google")
+    assert decision["element_index"] == 0
+    assert decision["action"] == "click"
+    assert decision["source"] == "local"
+    assert decision["reason"] == "Best local label match (score 2, next best 1)"
+    assert 0.5 < decision["confidence"] < 1.0
+    
+    assert _local_shortcut(nodes, "sign in") is None  # Too little to go on
+    assert _local_shortcut(nodes, "sign up for the newsletter") is None
+    
+    nodes[1]["label"] = "Sign in with Google account"
+    assert _local_shortcut(nodes, "Sign in with Google") is None  # Tie
@@ -0,0 +1,56 @@
+from src.semantic_tree import build_tree, _get_semantic_type
+
+
+def test_build_tree_pairs_labels_with_inputs():
+    """Test that labels are grouped with the input below them"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node class="android.widget.FrameLayout" clickable="false" bounds="[0,0][1080,2340]">
+    <node class="android.widget.LinearLayout" clickable="false" bounds="[0,100][1080,800]">
+      <node text="Email" class="android.widget.TextView" clickable="false" bounds="[50,150][200,200]"/>
+      <node resource-id="com.app:id/email" class="android.widget.EditText" clickable="true" bounds="[50,220][300,320]"/>
+      <node text="Password" class="android.widget.TextView" clickable="false" bounds="[50,350][200,400]"/>
+      <node resource-id="com.app:id/password" class="android.widget.EditText" clickable="true" bounds="[50,420][300,520]"/>
+    </node>
+    <node text="LOGIN" resource-id="com.app:id/loginBtn" class="android.widget.Button" clickable="true" bounds="[100,600][980,700]"/>
+  </node>
+</hierarchy>"""
+
+    screen = build_tree(xml_content)["screen"]
+    form = screen["children"][0]["children"][0]
+
+    assert [c["type"] for c in form["children"]] == ["formGroup", "formGroup"]
+    assert form["children"][0]["label"] == "Email"
+    assert form["children"][0]["input"]["resourceId"] == "com.app:id/email"
+    assert form["children"][1]["label"] == "Password"
+    assert form["children"][1]["bounds"] == [50, 350, 300, 520]
+
+
+def test_build_tree_handles_deeply_nested_containers():
+    """Test that form grouping visits each container once, however deep"""
+    depth = 40
+    inner = (
+        '<node text="Name" class="android.widget.TextView" clickable="false" bounds="[0,0][200,50]"/>'
+        '<node resource-id="com.app:id/name" class="android.widget.EditText" clickable="true" bounds="[0,60][200,120]"/>'
+        '<node text="Notes" class="android.widget.TextView" clickable="false" bounds="[0,900][200,950]"/>'
+    )
+    xml_content = (
+        "<hierarchy>"
+        + '<node class="android.widget.LinearLayout" clickable="false" bounds="[0,0][1080,2340]">' * depth
+        + inner
+        + "</node>" * depth
+        + "</hierarchy>"
+    )
+
+    node = build_tree(xml_content)["screen"]
+    for _ in range(depth):
+        node = node["children"][0]
+
+    assert [c["type"] for c in node["children"]] == ["formGroup", "label"]
+    assert node["children"][0]["label"] == "Name"
+
+
+def test_semantic_type_checks_the_full_class_name():
+    """Test that package names take part in the substring rules"""
+    assert _get_semantic_type("com.x.textinput.Button", False, False) == "input"
+    assert _get_semantic_type("android.widget.Button", False, False) == "button"
@@ -0,0 +1,31 @@
+import io
+from src.true_tree_parser import parse_true_tree
+
+
+def test_parse_true_tree_flattens_wrappers_without_ids():
+    """Test that single-child wrapper containers take no id or path segment"""
+    xml_content = """<?xml version='1.0' encoding='UTF-8'?>
+<hierarchy>
+  <node class="android.widget.LinearLayout" clickable="false" enabled="true">
+    <node class="android.widget.FrameLayout" clickable="false" enabled="true">
+      <node text="Email" class="android.widget.TextView" clickable="false" enabled="true"/>
+    </node>
+    <node class="android.widget.EditText" clickable="true" enabled="true" bounds="[0,100][500,200]"/>
+  </node>
+</hierarchy>"""
+    
+    result = parse_true_tree(io.BytesIO(xml_content.encode()))
+    
+    # hierarchy, layout, text, input - the FrameLayout wrapper is gone
+    assert sorted(result["flat_index"]) == [0, 1, 2, 3]
+    assert result["total_elements"] == 4
+    
+    layout = result["tree"]["children"][0]
+    label, field = layout["children"]
+    assert label["id"] == 2
+    assert label["path"] == "/element[0]/layout[1]/text[2]"
+    assert label["parent_was_container"] is True
+    assert field["path"] == "/element[0]/layout[1]/input[3]"
+    
+    assert result["analysis"]["forms"][0]["input_id"] == 3
+    assert result["analysis"]["forms"][0]["label"] == "Email"